@@ -12,7 +12,7 @@ import logging
 
 from app.core.security import get_current_user, require_author
 from app.core.firebase_admin import get_firestore, get_document, update_document, upload_file
-from app.services.ai.tts_service import get_tts_service, AVAILABLE_VOICES
+from app.services.ai.tts_service import get_tts_service, AVAILABLE_VOICES, VOICE_INFO_BY_ID
 
 logger = logging.getLogger(__name__)
 
@@ -67,10 +67,7 @@ class AudioListResponse(BaseModel):
 
 def _get_voice_info(voice_id: str) -> dict:
     """Get voice info from available voices"""
-    for v in AVAILABLE_VOICES:
-        if v["id"] == voice_id:
-            return v
-    return AVAILABLE_VOICES[0]
+    return VOICE_INFO_BY_ID.get(voice_id, AVAILABLE_VOICES[0])
 
 
 def _audio_to_response(audio_id: str, data: dict) -> AudioResponse:
@@ -42,6 +42,24 @@ class TranslateResponse(BaseModel):
     confidence: float = 1.0
 
 
+class TranslateBatchRequest(BaseModel):
+    """Request to translate several texts at once"""
+    texts: List[str] = Field(..., min_length=1, max_length=500)
+    source_language: str = Field(
+        default="auto",
+        description="Source language code (es, pt) or 'auto' for detection"
+    )
+    target_language: str = Field(
+        ...,
+        description="Target language code (es, pt)"
+    )
+
+
+class TranslateBatchResponse(BaseModel):
+    """Batch translation response, in request order"""
+    translations: List[TranslateResponse]
+
+
 class DetectLanguageRequest(BaseModel):
     """Request to detect language"""
     text: str = Field(..., min_length=1, max_length=5000)
@@ -147,6 +165,67 @@ async def translate_text(
         )
 
 
+@router.post("/batch", response_model=TranslateBatchResponse)
+async def translate_batch(
+    request: TranslateBatchRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Translate several texts (e.g. lesson vocabulary or slide bullets) in one request.
+
+    - **texts**: Texts to translate (max 500 items)
+    - **source_language**: Source language code ('es', 'pt', or 'auto' for detection)
+    - **target_language**: Target language code ('es' or 'pt')
+    """
+    if request.target_language not in SUPPORTED_LANGUAGES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported target language: {request.target_language}. "
+                   f"Supported languages: {list(SUPPORTED_LANGUAGES.keys())}"
+        )
+
+    if request.source_language != "auto" and request.source_language not in SUPPORTED_LANGUAGES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported source language: {request.source_language}. "
+                   f"Use 'auto' for detection or specify: {list(SUPPORTED_LANGUAGES.keys())}"
+        )
+
+    try:
+        translate_service = get_translate_service()
+
+        results = await translate_service.translate_batch(
+            texts=request.texts,
+            source_language=request.source_language,
+            target_language=request.target_language,
+        )
+
+        return TranslateBatchResponse(
+            translations=[
+                TranslateResponse(
+                    translated_text=translated_text,
+                    detected_language=detected_language,
+                    source_language=request.source_language,
+                    target_language=request.target_language,
+                    confidence=confidence,
+                )
+                for translated_text, detected_language, confidence in results
+            ]
+        )
+
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Batch translation error: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error al traducir los textos. Por favor intenta de nuevo."
+        )
+
+
 @router.post("/detect", response_model=DetectLanguageResponse)
 async def detect_language(
     request: DetectLanguageRequest,
@@ -2,15 +2,17 @@
 AI Studio - Videos endpoints
 Generate avatar videos with HeyGen API
 """
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Request
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
+import asyncio
+import orjson
 import uuid
 import logging
 
-from app.core.security import get_current_user, require_author
+from app.core.security import get_current_user, require_admin, require_author
 from app.core.firebase_admin import get_firestore, get_document, update_document
 from app.services.ai.heygen_service import get_heygen_service
 
@@ -121,70 +123,180 @@ def _video_to_response(vid_id: str, data: dict) -> VideoResponse:
     )
 
 
+# HeyGen jobs awaiting completion: heygen_video_id -> {"video_id", "attempts"}
+_pending_heygen_jobs: Dict[str, Dict[str, Any]] = {}
+_heygen_poller_running = False
+
+HEYGEN_POLL_INTERVAL_SECONDS = 30
+HEYGEN_POLL_MAX_ATTEMPTS = 60  # Poll each video for up to 30 minutes
+
+
+def _apply_heygen_status(db, video_id: str, status_data: dict) -> bool:
+    """Persist a HeyGen status update. Returns True once the job is finished."""
+    current_status = status_data.get("status")
+    logger.info(f"HeyGen status for {video_id}: {current_status}")
+
+    if current_status == "completed":
+        # Video is ready
+        db.collection("generated_videos").document(video_id).update({
+            "status": VideoStatus.COMPLETED.value,
+            "videoUrl": status_data.get("video_url"),
+            "thumbnailUrl": status_data.get("thumbnail_url"),
+            "duration": status_data.get("duration"),
+            "errorMessage": None,
+            "completedAt": datetime.utcnow(),
+            "updatedAt": datetime.utcnow(),
+        })
+        logger.info(f"Video {video_id} completed successfully")
+        return True
+
+    if current_status == "failed":
+        # Video generation failed
+        db.collection("generated_videos").document(video_id).update({
+            "status": VideoStatus.FAILED.value,
+            "errorMessage": status_data.get("error", "Video generation failed"),
+            "updatedAt": datetime.utcnow(),
+        })
+        logger.error(f"Video {video_id} failed: {status_data.get('error')}")
+        return True
+
+    if current_status == "processing":
+        # Still processing
+        db.collection("generated_videos").document(video_id).update({
+            "status": VideoStatus.PROCESSING.value,
+            "updatedAt": datetime.utcnow(),
+        })
+
+    return False
+
+
 async def _poll_heygen_status(video_id: str, heygen_video_id: str):
-    """Background task to poll HeyGen for video status"""
-    import asyncio
+    """
+    Background task to poll HeyGen for video status.
 
-    heygen = get_heygen_service()
-    db = get_firestore()
+    Jobs are registered in a shared table; the first task to find no poller
+    running becomes the poller and checks every pending job in one batch per
+    tick until the table is empty. Later tasks just register and return.
+    """
+    global _heygen_poller_running
 
-    max_attempts = 60  # Poll for up to 30 minutes (every 30 seconds)
-    attempt = 0
+    _pending_heygen_jobs[heygen_video_id] = {"video_id": video_id, "attempts": 0}
+    if _heygen_poller_running:
+        return
 
-    while attempt < max_attempts:
-        try:
-            status_data = await heygen.get_video_status(heygen_video_id)
-            current_status = status_data.get("status")
+    _heygen_poller_running = True
+    try:
+        heygen = get_heygen_service()
+        db = get_firestore()
+
+        while _pending_heygen_jobs:
+            heygen_ids = list(_pending_heygen_jobs)
+            results = await heygen.get_video_statuses(heygen_ids)
+
+            for heygen_id, result in zip(heygen_ids, results):
+                # The webhook may have settled this job during the await
+                job = _pending_heygen_jobs.get(heygen_id)
+                if job is None:
+                    continue
+                job["attempts"] += 1
+                try:
+                    if isinstance(result, Exception):
+                        raise result
+                    finished = _apply_heygen_status(db, job["video_id"], result)
+                except Exception as e:
+                    logger.error(f"Error polling HeyGen status for {job['video_id']}: {e}")
+                    finished = False
+
+                if finished:
+                    _pending_heygen_jobs.pop(heygen_id, None)
+                elif job["attempts"] >= HEYGEN_POLL_MAX_ATTEMPTS:
+                    # Timeout - mark as failed. A failed write must not stop the
+                    # shared poller; the job is dropped either way.
+                    _pending_heygen_jobs.pop(heygen_id, None)
+                    logger.error(f"Video {job['video_id']} timed out after {job['attempts']} attempts")
+                    try:
+                        db.collection("generated_videos").document(job["video_id"]).update({
+                            "status": VideoStatus.FAILED.value,
+                            "errorMessage": "Video generation timed out. Please try again.",
+                            "updatedAt": datetime.utcnow(),
+                        })
+                    except Exception as e:
+                        logger.error(f"Could not mark video {job['video_id']} as timed out: {e}")
+
+            if _pending_heygen_jobs:
+                # Wait before next poll
+                await asyncio.sleep(HEYGEN_POLL_INTERVAL_SECONDS)
+    finally:
+        _heygen_poller_running = False
+
+
+@router.post("/webhooks/heygen")
+async def heygen_webhook(request: Request):
+    """
+    Receive video completion events from HeyGen
 
-            logger.info(f"HeyGen status for {video_id}: {current_status}")
+    Replaces polling for videos generated while the webhook is registered;
+    the poller still covers anything HeyGen fails to deliver.
+    """
+    body = await request.body()
+    heygen = get_heygen_service()
+    if not heygen.verify_webhook_signature(body, request.headers.get("Signature")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid webhook signature"
+        )
 
-            if current_status == "completed":
-                # Video is ready
-                db.collection("generated_videos").document(video_id).update({
-                    "status": VideoStatus.COMPLETED.value,
-                    "videoUrl": status_data.get("video_url"),
-                    "thumbnailUrl": status_data.get("thumbnail_url"),
-                    "duration": status_data.get("duration"),
-                    "errorMessage": None,
-                    "completedAt": datetime.utcnow(),
-                    "updatedAt": datetime.utcnow(),
-                })
-                logger.info(f"Video {video_id} completed successfully")
-                return
+    try:
+        event = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid webhook payload"
+        )
 
-            elif current_status == "failed":
-                # Video generation failed
-                db.collection("generated_videos").document(video_id).update({
-                    "status": VideoStatus.FAILED.value,
-                    "errorMessage": status_data.get("error", "Video generation failed"),
-                    "updatedAt": datetime.utcnow(),
-                })
-                logger.error(f"Video {video_id} failed: {status_data.get('error')}")
-                return
+    status_data = await heygen.handle_webhook_event(event)
+    if status_data is None:
+        return {"received": True}
 
-            elif current_status == "processing":
-                # Still processing
-                db.collection("generated_videos").document(video_id).update({
-                    "status": VideoStatus.PROCESSING.value,
-                    "updatedAt": datetime.utcnow(),
-                })
+    heygen_video_id = status_data["video_id"]
+    db = get_firestore()
+    docs = (
+        db.collection("generated_videos")
+        .where("heygenVideoId", "==", heygen_video_id)
+        .limit(1)
+        .get()
+    )
+    for doc in docs:
+        if _apply_heygen_status(db, doc.id, status_data):
+            _pending_heygen_jobs.pop(heygen_video_id, None)
 
-            # Wait before next poll
-            await asyncio.sleep(30)
-            attempt += 1
+    return {"received": True}
 
-        except Exception as e:
-            logger.error(f"Error polling HeyGen status for {video_id}: {e}")
-            await asyncio.sleep(30)
-            attempt += 1
 
-    # Timeout - mark as failed
-    db.collection("generated_videos").document(video_id).update({
-        "status": VideoStatus.FAILED.value,
-        "errorMessage": "Video generation timed out. Please try again.",
-        "updatedAt": datetime.utcnow(),
-    })
-    logger.error(f"Video {video_id} timed out after {max_attempts} attempts")
+@router.post("/webhooks/heygen/register")
+async def register_heygen_webhook(
+    request: Request,
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Register this API's webhook endpoint with HeyGen
+    Admin only. Store the returned secret as HEYGEN_WEBHOOK_SECRET.
+    """
+    url = str(request.url_for("heygen_webhook"))
+    try:
+        heygen = get_heygen_service()
+        return await heygen.register_webhook(url)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Error registering HeyGen webhook: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to register HeyGen webhook"
+        )
 
 
 @router.get("/avatars", response_model=List[AvatarInfo])
@@ -10,7 +10,6 @@ from datetime import datetime
 from enum import Enum
 import io
 import hashlib
-import qrcode
 
 from app.core.security import get_current_user, require_admin, get_password_hash
 from app.core.firebase_admin import (
@@ -19,6 +18,7 @@ from app.core.firebase_admin import (
     update_document,
     delete_document,
 )
+from app.services.qr_service import get_qr_service
 
 router = APIRouter()
 
@@ -126,22 +126,7 @@ def _generate_qr_hash(student_id: str, email: str) -> str:
 
 def _generate_qr_image(data: str) -> bytes:
     """Generate QR code image as PNG bytes"""
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-
-    img = qr.make_image(fill_color="black", back_color="white")
-
-    img_buffer = io.BytesIO()
-    img.save(img_buffer, format="PNG")
-    img_buffer.seek(0)
-
-    return img_buffer.getvalue()
+    return get_qr_service().generate_qr_image(data, error_correction="L", cache=True)
 
 
 @router.get("", response_model=StudentListResponse)
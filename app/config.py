@@ -27,6 +27,7 @@ class Settings(BaseSettings):
     # Google AI (Gemini)
     google_api_key: str = ""
     gemini_api_key: str = ""  # Alias for google_api_key
+    gemini_max_concurrency: int = 16  # Max in-flight Gemini requests per worker
 
     # Google OAuth
     google_client_id: str = ""
@@ -34,6 +35,7 @@ class Settings(BaseSettings):
 
     # HeyGen API
     heygen_api_key: str = ""
+    heygen_webhook_secret: str = ""  # Signing secret returned when registering the webhook
 
     # CORS
     cors_origins: str = "http://localhost:3000,http://localhost:5173,https://apololms.web.app,https://apololms.firebaseapp.com,https://apololms-student.web.app,https://apololms-student.firebaseapp.com"
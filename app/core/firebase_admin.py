@@ -88,10 +88,10 @@ def get_auth():
 
 
 # Helper functions for Firestore operations
-async def get_document(collection: str, doc_id: str) -> dict | None:
-    """Get a single document from Firestore"""
+async def get_document(collection: str, doc_id: str, field_paths: list = None) -> dict | None:
+    """Get a single document from Firestore, optionally only the given fields"""
     db = get_firestore()
-    doc = db.collection(collection).document(doc_id).get()
+    doc = db.collection(collection).document(doc_id).get(field_paths=field_paths)
     if doc.exists:
         data = doc.to_dict()
         data['id'] = doc.id
@@ -9,6 +9,10 @@ from contextlib import asynccontextmanager
 from app.config import settings
 from app.core.firebase_admin import initialize_firebase
 from app.api.v1.router import api_router
+from app.services.ai.gemini_service import get_gemini_service
+from app.services.ai.heygen_service import get_heygen_service
+from app.services.ai.tts_service import get_tts_service
+from app.services.ai.translate_service import get_translate_service
 
 
 @asynccontextmanager
@@ -17,9 +21,15 @@ async def lifespan(app: FastAPI):
     # Startup
     initialize_firebase()
     print("Firebase initialized successfully")
+    await get_gemini_service().warmup()
+    await get_tts_service().warmup()
+    await get_translate_service().warmup()
     yield
     # Shutdown
     print("Shutting down ApoloLMS API")
+    await get_gemini_service().aclose()
+    await get_heygen_service().aclose()
+    await get_tts_service().aclose()
 
 
 # Create FastAPI application
@@ -4,3 +4,10 @@ from app.models.domain.ai.presentation import Presentation, Slide, SlideType
 from app.models.domain.ai.mindmap import MindMap, MindMapNode
 from app.models.domain.ai.podcast import Podcast, PodcastSegment, PodcastStyle
 from app.models.domain.ai.video import GeneratedVideo, VideoStyle, VideoGenerationStatus
+from app.models.domain.ai.generation import (
+    GeneratedLesson,
+    GeneratedPresentation,
+    GeneratedPodcastScript,
+    GeneratedQuiz,
+    GeneratedVideoPrompt,
+)
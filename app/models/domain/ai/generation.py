@@ -0,0 +1,87 @@
+"""
+Gemini structured output models
+Response schemas passed to Gemini so generation returns valid JSON of a known shape
+"""
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class GeneratedLessonQuestion(BaseModel):
+    """Practice question inside a generated lesson"""
+    question: str
+    options: List[str]
+    correct_index: int
+    explanation: Optional[str] = None
+
+
+class GeneratedLesson(BaseModel):
+    """Lesson content as returned by Gemini"""
+    title: str
+    objectives: List[str]
+    content: str
+    key_points: List[str]
+    questions: List[GeneratedLessonQuestion]
+
+
+class GeneratedSlide(BaseModel):
+    """Single slide as returned by Gemini"""
+    order: int
+    title: str
+    type: str
+    bullet_points: List[str]
+    notes: Optional[str] = None
+
+
+class GeneratedPresentation(BaseModel):
+    """Presentation slides as returned by Gemini"""
+    title: str
+    slides: List[GeneratedSlide]
+
+
+class GeneratedPodcastSegment(BaseModel):
+    """Single dialogue turn as returned by Gemini"""
+    order: int
+    speaker_id: str
+    speaker_name: str
+    text: str
+    duration_estimate: Optional[int] = None
+
+
+class GeneratedPodcastScript(BaseModel):
+    """Podcast script as returned by Gemini"""
+    title: str
+    segments: List[GeneratedPodcastSegment]
+
+
+class GeneratedQuizOption(BaseModel):
+    """Answer option of a generated quiz question"""
+    text: str
+    is_correct: bool
+
+
+class GeneratedQuizQuestion(BaseModel):
+    """Multiple choice question as returned by Gemini"""
+    id: str
+    question_text: str
+    options: List[GeneratedQuizOption]
+    explanation: Optional[str] = None
+
+
+class GeneratedQuiz(BaseModel):
+    """Quiz questions as returned by Gemini"""
+    questions: List[GeneratedQuizQuestion]
+
+
+class GeneratedVideoScene(BaseModel):
+    """Scene description of a generated video prompt"""
+    order: int
+    description: str
+    duration_seconds: Optional[int] = None
+
+
+class GeneratedVideoPrompt(BaseModel):
+    """Video generation prompt as returned by Gemini"""
+    visual_prompt: str
+    narration_script: Optional[str] = None
+    scenes: List[GeneratedVideoScene]
+    style_notes: Optional[str] = None
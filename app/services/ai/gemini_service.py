@@ -3,12 +3,21 @@ Gemini AI Service
 Content generation using Google Gemini (new google-genai SDK)
 Supports both static prompts (backward compatible) and configurable prompts (unified prompt service)
 """
-import json
+import asyncio
+import functools
+import hashlib
 import logging
-from typing import Optional, List, Dict, Any
-
+import random
+import statistics
+import time
+from collections import deque
+from typing import Optional, List, Dict, Any, Tuple, Type, Deque
+
+import httpx
+import orjson
 from google import genai
-from google.genai import types
+from google.genai import errors, types
+from pydantic import BaseModel, ValidationError
 
 from app.config import settings
 from app.core.firebase_admin import get_document
@@ -21,138 +30,47 @@ from app.services.ai.knowledge import (
     get_video_prompt,
     VOICES,
 )
+from app.models.domain.ai.generation import (
+    GeneratedLesson,
+    GeneratedPresentation,
+    GeneratedPodcastScript,
+    GeneratedQuiz,
+    GeneratedVideoPrompt,
+)
 from app.models.domain.ai.prompt_config import AIModule, GenerationContext
 
 logger = logging.getLogger(__name__)
 
-# Master prompt for Portuguese language learning content (static fallback)
-PORTUGUESE_LEARNING_CONTEXT = get_master_prompt()
-
-
-class GeminiService:
-    """Service for generating content with Gemini"""
-
-    def __init__(self):
-        self._client = None
-        self._initialized = False
-
-    async def _ensure_initialized(self):
-        """Initialize Gemini with API key from settings or Firestore"""
-        if self._initialized:
-            return
-
-        api_key = settings.gemini_api_key
-
-        # Try to get API key from Firestore settings if not in env
-        if not api_key:
-            try:
-                app_settings = await get_document("settings", "app")
-                if app_settings:
-                    api_key = app_settings.get("gemini_api_key")
-            except Exception as e:
-                logger.warning(f"Could not fetch Gemini API key from Firestore: {e}")
 
-        if not api_key:
-            raise ValueError("Gemini API key not configured")
+class _InflightCancelled(Exception):
+    """The caller running a shared generation was cancelled before it finished"""
 
-        # Initialize the new google-genai client
-        self._client = genai.Client(api_key=api_key)
-        self._initialized = True
 
-    async def generate_text(
-        self,
-        prompt: str,
-        system_instruction: Optional[str] = None,
-        temperature: float = 0.7,
-        max_tokens: int = 4096,
-    ) -> str:
-        """Generate text content"""
-        await self._ensure_initialized()
-
-        try:
-            # Build the full prompt with system instruction
-            full_prompt = prompt
-            if system_instruction:
-                full_prompt = f"{system_instruction}\n\n{prompt}"
-
-            # Use the new google-genai SDK
-            response = self._client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=full_prompt,
-                config=types.GenerateContentConfig(
-                    temperature=temperature,
-                    max_output_tokens=max_tokens,
-                )
-            )
-            return response.text
-
-        except Exception as e:
-            logger.error(f"Gemini text generation error: {e}")
-            raise
-
-    async def generate_json(
-        self,
-        prompt: str,
-        schema: Optional[Dict] = None,
-        system_instruction: Optional[str] = None,
-    ) -> Dict:
-        """Generate structured JSON content"""
-        await self._ensure_initialized()
+@functools.cache
+def _knowledge_context_pt_es() -> str:
+    """Knowledge base section for PT/ES content, built from the master prompt on first use"""
+    return f"""
+BASE DE CONOCIMIENTO EDUCATIVO (Portugués Brasileño para Hispanohablantes):
+{get_master_prompt()}
 
-        # Add JSON formatting instructions
-        json_instruction = """
-IMPORTANTE: Responde ÚNICAMENTE con JSON válido.
-- No uses markdown (no ```json)
-- No agregues explicaciones
-- El JSON debe seguir exactamente el esquema proporcionado.
+---
 """
-        if schema:
-            json_instruction += f"\nEsquema esperado: {json.dumps(schema, indent=2)}"
-
-        # Build complete prompt with all instructions
-        full_prompt = ""
-        if system_instruction:
-            full_prompt += f"{system_instruction}\n\n"
-        full_prompt += f"{json_instruction}\n\n{prompt}"
 
-        try:
-            response = self._client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=full_prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.7,
-                    max_output_tokens=8192,
-                )
-            )
-            text = response.text.strip()
 
-            # Clean up response if wrapped in markdown code blocks
-            if text.startswith("```json"):
-                text = text[7:]
-            if text.startswith("```"):
-                text = text[3:]
-            if text.endswith("```"):
-                text = text[:-3]
+@functools.cache
+def _knowledge_context() -> str:
+    """Generic knowledge base section, built from the master prompt on first use"""
+    return f"""
+BASE DE CONOCIMIENTO EDUCATIVO:
+{get_master_prompt()}
 
-            return json.loads(text.strip())
+---
+"""
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Gemini JSON response: {e}")
-            raise ValueError(f"Invalid JSON response from Gemini: {e}")
-        except Exception as e:
-            logger.error(f"Gemini JSON generation error: {e}")
-            raise
 
-    async def generate_lesson_content(
-        self,
-        topic: str,
-        lesson_type: str = "article",
-        language: str = "es",
-        difficulty: str = "intermediate",
-        additional_context: Optional[str] = None,
-    ) -> Dict:
-        """Generate lesson content for a specific topic"""
-        system_instruction = f"""
+# Prompt templates for the static (non-configurable) generation methods.
+# Rendered with str.format, so literal JSON braces are doubled.
+LESSON_SYSTEM_TEMPLATE = """
 Eres un experto educador creando contenido para un curso de idiomas.
 Idioma del contenido: {language}
 Nivel de dificultad: {difficulty}
@@ -160,12 +78,12 @@ Nivel de dificultad: {difficulty}
 Genera contenido educativo estructurado y atractivo.
 """
 
-        prompt = f"""
+LESSON_PROMPT_TEMPLATE = """
 Genera contenido para una lección sobre: {topic}
 
 Tipo de lección: {lesson_type}
 
-{f"Contexto adicional: {additional_context}" if additional_context else ""}
+{additional_context}
 
 El contenido debe incluir:
 1. Título atractivo
@@ -191,26 +109,7 @@ Responde en JSON con esta estructura:
 }}
 """
 
-        return await self.generate_json(prompt, system_instruction=system_instruction)
-
-    async def generate_presentation_slides(
-        self,
-        topic: str,
-        num_slides: int = 10,
-        language: str = "es",
-        additional_context: Optional[str] = None,
-        use_knowledge_base: bool = True,
-    ) -> List[Dict]:
-        """Generate presentation slides for a topic"""
-        knowledge_context = ""
-        if use_knowledge_base and language in ["pt", "es"]:
-            knowledge_context = f"""
-BASE DE CONOCIMIENTO EDUCATIVO (Portugués Brasileño para Hispanohablantes):
-{PORTUGUESE_LEARNING_CONTEXT}
-
----
-"""
-        system_instruction = f"""
+PRESENTATION_SYSTEM_TEMPLATE = """
 Eres un experto en crear presentaciones educativas profesionales.
 Idioma: {language}
 Crea slides claras, concisas y visualmente atractivas.
@@ -223,10 +122,10 @@ IMPORTANTE para contenido de portugués:
 - Usar ejemplos prácticos para estudiantes peruanos
 """
 
-        prompt = f"""
+PRESENTATION_PROMPT_TEMPLATE = """
 Genera {num_slides} slides para una presentación sobre: {topic}
 
-{f"Contexto adicional: {additional_context}" if additional_context else ""}
+{additional_context}
 
 Cada slide debe tener:
 - Título conciso
@@ -249,27 +148,7 @@ Responde en JSON con esta estructura:
 }}
 """
 
-        result = await self.generate_json(prompt, system_instruction=system_instruction)
-        return result.get("slides", [])
-
-    async def generate_mindmap(
-        self,
-        topic: str,
-        depth: int = 3,
-        language: str = "es",
-        additional_context: Optional[str] = None,
-        use_knowledge_base: bool = True,
-    ) -> Dict:
-        """Generate a mind map structure for a topic"""
-        knowledge_context = ""
-        if use_knowledge_base and language in ["pt", "es"]:
-            knowledge_context = f"""
-BASE DE CONOCIMIENTO EDUCATIVO (Portugués Brasileño para Hispanohablantes):
-{PORTUGUESE_LEARNING_CONTEXT}
-
----
-"""
-        system_instruction = f"""
+MINDMAP_SYSTEM_TEMPLATE = """
 Eres un experto en organización del conocimiento y mapas mentales.
 Idioma: {language}
 Crea estructuras jerárquicas claras y lógicas.
@@ -282,11 +161,11 @@ Para contenido de portugués brasileño:
 - Añade ejemplos de pronunciación en los nodos finales
 """
 
-        prompt = f"""
+MINDMAP_PROMPT_TEMPLATE = """
 Genera un mapa mental sobre: {topic}
 
 Profundidad máxima: {depth} niveles
-{f"Contexto adicional: {additional_context}" if additional_context else ""}
+{additional_context}
 
 El mapa debe tener:
 - Un nodo central con el tema principal
@@ -309,43 +188,7 @@ Responde en JSON con esta estructura recursiva:
 }}
 """
 
-        return await self.generate_json(prompt, system_instruction=system_instruction)
-
-    async def generate_podcast_script(
-        self,
-        topic: str,
-        style: str = "conversational",
-        duration_minutes: int = 10,
-        speakers: List[Dict] = None,
-        language: str = "es",
-        additional_context: Optional[str] = None,
-        use_knowledge_base: bool = True,
-    ) -> List[Dict]:
-        """Generate a podcast script with multiple speakers for Portuguese language learning"""
-        if speakers is None:
-            speakers = [
-                {"id": "host_male", "name": "Carlos", "role": "host"},
-                {"id": "host_female", "name": "Ana", "role": "expert"}
-            ]
-
-        # Build speaker descriptions
-        speakers_info = []
-        for s in speakers:
-            gender = "masculina" if "male" in s.get("id", "") else "femenina"
-            speakers_info.append(f"{s['name']} (voz {gender}, rol: {s['role']})")
-        speakers_desc = " y ".join(speakers_info)
-
-        # Use knowledge base context if enabled
-        knowledge_context = ""
-        if use_knowledge_base:
-            knowledge_context = f"""
-BASE DE CONOCIMIENTO EDUCATIVO:
-{PORTUGUESE_LEARNING_CONTEXT}
-
----
-"""
-
-        system_instruction = f"""
+PODCAST_SYSTEM_TEMPLATE = """
 Eres un guionista experto en podcasts educativos para enseñanza de idiomas.
 Tu especialidad es crear contenido para hispanohablantes que aprenden PORTUGUÉS BRASILEÑO.
 
@@ -376,17 +219,17 @@ FORMATO DEL CONTENIDO:
 - Usar ejemplos prácticos y situaciones cotidianas relevantes para peruanos
 """
 
-        prompt = f"""
+PODCAST_PROMPT_TEMPLATE = """
 Genera un guión de podcast educativo sobre: {topic}
 
 PARÁMETROS:
-- Duración: {duration_minutes} minutos (aproximadamente {duration_minutes * 130} palabras total)
+- Duración: {duration_minutes} minutos (aproximadamente {word_count} palabras total)
 - Estilo: {style}
 - Idioma principal: español con ejemplos en portugués
-{f"- Contexto adicional: {additional_context}" if additional_context else ""}
+{additional_context}
 
 HABLANTES (usar exactamente estos IDs):
-{json.dumps(speakers, indent=2)}
+{speakers_json}
 
 ESTRUCTURA DEL PODCAST:
 1. INTRO (10%): Saludo animado, presentación del tema de hoy
@@ -421,18 +264,7 @@ Responde SOLO con JSON válido:
 }}
 """
 
-        result = await self.generate_json(prompt, system_instruction=system_instruction)
-        return result.get("segments", [])
-
-    async def generate_quiz_questions(
-        self,
-        topic: str,
-        num_questions: int = 5,
-        difficulty: str = "intermediate",
-        language: str = "es",
-    ) -> List[Dict]:
-        """Generate quiz questions for a topic"""
-        system_instruction = f"""
+QUIZ_SYSTEM_TEMPLATE = """
 Eres un experto en evaluación educativa.
 Idioma: {language}
 Dificultad: {difficulty}
@@ -440,7 +272,7 @@ Dificultad: {difficulty}
 Crea preguntas que evalúen comprensión real, no memorización.
 """
 
-        prompt = f"""
+QUIZ_PROMPT_TEMPLATE = """
 Genera {num_questions} preguntas de opción múltiple sobre: {topic}
 
 Cada pregunta debe:
@@ -467,30 +299,18 @@ Responde en JSON:
 }}
 """
 
-        result = await self.generate_json(prompt, system_instruction=system_instruction)
-        return result.get("questions", [])
-
-    async def generate_video_prompt(
-        self,
-        topic: str,
-        style: str = "explainer",
-        duration_seconds: int = 60,
-        language: str = "es",
-        additional_context: Optional[str] = None,
-    ) -> Dict:
-        """Generate a detailed video generation prompt for Veo 3"""
-        system_instruction = f"""
+VIDEO_SYSTEM_TEMPLATE = """
 Eres un director de video educativo experto.
 Idioma: {language}
 Crea descripciones detalladas para generación de video con IA.
 """
 
-        prompt = f"""
+VIDEO_PROMPT_TEMPLATE = """
 Crea una descripción detallada para generar un video sobre: {topic}
 
 Estilo: {style}
 Duración: {duration_seconds} segundos
-{f"Contexto adicional: {additional_context}" if additional_context else ""}
+{additional_context}
 
 La descripción debe incluir:
 - Prompt visual detallado para el generador de video
@@ -513,8 +333,486 @@ Responde en JSON:
 }}
 """
 
+
+# Expected output shape for unified podcast generation
+PODCAST_SCHEMA = {
+    "title": "string",
+    "segments": [
+        {
+            "order": "number",
+            "speaker_id": "string",
+            "speaker_name": "string",
+            "text": "string",
+            "duration_estimate": "number"
+        }
+    ]
+}
+
+
+def _context_line(additional_context: Optional[str], prefix: str = "") -> str:
+    """Render the optional 'Contexto adicional' line of a prompt"""
+    if not additional_context:
+        return ""
+    return f"{prefix}Contexto adicional: {additional_context}"
+
+
+# Default podcast hosts when the caller doesn't provide speakers
+DEFAULT_PODCAST_SPEAKERS = [
+    {"id": "host_male", "name": "Carlos", "role": "host"},
+    {"id": "host_female", "name": "Ana", "role": "expert"}
+]
+
+
+@functools.lru_cache(maxsize=32)
+def _format_speakers(speakers_key: Tuple[Tuple[Tuple[str, Any], ...], ...]) -> Tuple[str, str]:
+    """Build the (description, JSON) pair used in podcast prompts for a speaker list"""
+    speakers = [dict(items) for items in speakers_key]
+    speakers_desc = " y ".join(
+        f"{s['name']} (voz {'masculina' if 'male' in s.get('id', '') else 'femenina'}, rol: {s['role']})"
+        for s in speakers
+    )
+    return speakers_desc, orjson.dumps(speakers).decode()
+
+
+class GeminiService:
+    """Service for generating content with Gemini"""
+
+    _result_cache_ttl_seconds = 3600  # 1 hour cache
+    _result_cache_max_entries = 1024
+
+    _max_attempts = 3
+    _backoff_base_seconds = 0.5
+    _retryable_status_codes = frozenset({429, 500, 502, 503, 504})
+    _hedge_min_samples = 10  # Latency samples needed before hedging kicks in
+
+    def __init__(self):
+        self._client = None
+        # Pooled transport handed to the genai client; owned (and closed) by us
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._initialized = False
+        # Unified prompt results keyed by a hash of the final prompt + config
+        self._result_cache: Dict[str, Tuple[float, str]] = {}
+        # Unified prompt requests currently waiting on Gemini, by the same key
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Bounds in-flight Gemini requests so bursts don't exceed the API quota
+        self._semaphore = asyncio.Semaphore(settings.gemini_max_concurrency)
+        self._init_lock = asyncio.Lock()
+        # Recent successful request latencies, used to pick the hedge delay
+        self._latencies: Deque[float] = deque(maxlen=100)
+
+    async def _ensure_initialized(self):
+        """Initialize Gemini with API key from settings or Firestore"""
+        if self._initialized:
+            return
+
+        # Concurrent first requests wait for a single client construction
+        async with self._init_lock:
+            if self._initialized:
+                return
+
+            api_key = settings.gemini_api_key
+
+            # Try to get API key from Firestore settings if not in env
+            if not api_key:
+                try:
+                    app_settings = await get_document("settings", "app")
+                    if app_settings:
+                        api_key = app_settings.get("gemini_api_key")
+                except Exception as e:
+                    logger.warning(f"Could not fetch Gemini API key from Firestore: {e}")
+
+            if not api_key:
+                raise ValueError("Gemini API key not configured")
+
+            # Initialize the new google-genai client on our own httpx client, so
+            # requests multiplex over pooled HTTP/2 connections instead of
+            # paying a TLS handshake per call. Passing the client (rather than
+            # async_client_args) also keeps the SDK off its aiohttp transport,
+            # which it otherwise picks whenever aiohttp is importable.
+            self._http_client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=settings.gemini_max_concurrency,
+                    max_keepalive_connections=settings.gemini_max_concurrency,
+                ),
+            )
+            self._client = genai.Client(
+                api_key=api_key,
+                http_options=types.HttpOptions(httpx_async_client=self._http_client),
+            )
+            self._initialized = True
+
+    async def aclose(self):
+        """Close the pooled HTTP client shared with the genai client"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+            self._client = None
+            self._initialized = False
+
+    async def warmup(self):
+        """
+        Prepare everything the first request would otherwise build lazily:
+        the API key lookup, the genai client and the default speaker prompt.
+        Never raises, so a missing key doesn't block application startup.
+        """
+        _format_speakers(tuple(tuple(s.items()) for s in DEFAULT_PODCAST_SPEAKERS))
+
+        try:
+            await self._ensure_initialized()
+        except Exception as e:
+            logger.warning(f"Gemini warmup skipped client initialization: {e}")
+
+    async def _generate(
+        self,
+        contents: str,
+        config: types.GenerateContentConfig,
+        hedged: bool = False,
+    ):
+        """
+        Call Gemini through the SDK's async client without blocking the event loop.
+
+        With hedged=True, a duplicate request is sent once the first one has
+        been running longer than the recent median latency, and whichever
+        answers first wins. This trims tail latency at the cost of extra
+        quota, so it's opt-in per call.
+        """
+        if not hedged or len(self._latencies) < self._hedge_min_samples:
+            return await self._generate_with_retry(contents, config)
+
+        hedge_delay = statistics.median(self._latencies)
+        tasks = {asyncio.create_task(self._generate_with_retry(contents, config))}
+        primary = next(iter(tasks))
+        try:
+            done, tasks = await asyncio.wait(tasks, timeout=hedge_delay)
+            if done:
+                return primary.result()
+
+            logger.info(f"Gemini request exceeded median latency ({hedge_delay:.2f}s), sending hedge")
+            tasks.add(asyncio.create_task(self._generate_with_retry(contents, config)))
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+
+            # Both attempts failed: surface the original request's error
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _generate_with_retry(self, contents: str, config: types.GenerateContentConfig):
+        """Send one Gemini request, retrying rate limits and server errors with backoff"""
+        for attempt in range(self._max_attempts):
+            started = time.monotonic()
+            try:
+                async with self._semaphore:
+                    response = await self._client.aio.models.generate_content(
+                        model="gemini-2.0-flash",
+                        contents=contents,
+                        config=config,
+                    )
+            except errors.APIError as e:
+                if e.code not in self._retryable_status_codes or attempt == self._max_attempts - 1:
+                    raise
+                delay = self._backoff_base_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+                logger.warning(f"Gemini returned {e.code}, retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+
+            self._latencies.append(time.monotonic() - started)
+            return response
+
+    async def generate_text(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4096,
+        hedged: bool = False,
+    ) -> str:
+        """Generate text content"""
+        await self._ensure_initialized()
+
+        try:
+            # Build the full prompt with system instruction
+            full_prompt = prompt
+            if system_instruction:
+                full_prompt = f"{system_instruction}\n\n{prompt}"
+
+            # Use the new google-genai SDK
+            response = await self._generate(
+                full_prompt,
+                types.GenerateContentConfig(
+                    temperature=temperature,
+                    max_output_tokens=max_tokens,
+                ),
+                hedged=hedged,
+            )
+            return response.text
+
+        except Exception as e:
+            logger.error(f"Gemini text generation error: {e}")
+            raise
+
+    async def generate_json(
+        self,
+        prompt: str,
+        schema: Optional[Dict] = None,
+        system_instruction: Optional[str] = None,
+        response_model: Optional[Type[BaseModel]] = None,
+        hedged: bool = False,
+    ) -> Dict:
+        """
+        Generate structured JSON content.
+
+        Gemini runs in JSON mode, so the response is always bare JSON. When
+        a response_model is given it is also enforced as the response schema
+        and used to validate the result.
+        """
+        await self._ensure_initialized()
+
+        # Build complete prompt with all instructions
+        full_prompt = ""
+        if system_instruction:
+            full_prompt += f"{system_instruction}\n\n"
+        if schema:
+            full_prompt += f"Esquema esperado: {orjson.dumps(schema).decode()}\n\n"
+        full_prompt += prompt
+
+        try:
+            response = await self._generate(
+                full_prompt,
+                types.GenerateContentConfig(
+                    temperature=0.7,
+                    max_output_tokens=8192,
+                    response_mime_type="application/json",
+                    response_schema=response_model,
+                ),
+                hedged=hedged,
+            )
+
+            if response_model is not None:
+                return response_model.model_validate_json(response.text).model_dump(exclude_none=True)
+            return orjson.loads(response.text)
+
+        except (orjson.JSONDecodeError, ValidationError) as e:
+            logger.error(f"Failed to parse Gemini JSON response: {e}")
+            raise ValueError(f"Invalid JSON response from Gemini: {e}")
+        except Exception as e:
+            logger.error(f"Gemini JSON generation error: {e}")
+            raise
+
+    async def generate_lesson_content(
+        self,
+        topic: str,
+        lesson_type: str = "article",
+        language: str = "es",
+        difficulty: str = "intermediate",
+        additional_context: Optional[str] = None,
+    ) -> Dict:
+        """Generate lesson content for a specific topic"""
+        system_instruction = LESSON_SYSTEM_TEMPLATE.format(
+            language=language,
+            difficulty=difficulty,
+        )
+
+        prompt = LESSON_PROMPT_TEMPLATE.format(
+            topic=topic,
+            lesson_type=lesson_type,
+            additional_context=_context_line(additional_context),
+        )
+
+        return await self.generate_json(
+            prompt,
+            system_instruction=system_instruction,
+            response_model=GeneratedLesson,
+        )
+
+    async def generate_presentation_slides(
+        self,
+        topic: str,
+        num_slides: int = 10,
+        language: str = "es",
+        additional_context: Optional[str] = None,
+        use_knowledge_base: bool = True,
+    ) -> List[Dict]:
+        """Generate presentation slides for a topic"""
+        knowledge_context = ""
+        if use_knowledge_base and language in ("pt", "es"):
+            knowledge_context = _knowledge_context_pt_es()
+        system_instruction = PRESENTATION_SYSTEM_TEMPLATE.format(
+            language=language,
+            knowledge_context=knowledge_context,
+        )
+
+        prompt = PRESENTATION_PROMPT_TEMPLATE.format(
+            topic=topic,
+            num_slides=num_slides,
+            additional_context=_context_line(additional_context),
+        )
+
+        result = await self.generate_json(
+            prompt,
+            system_instruction=system_instruction,
+            response_model=GeneratedPresentation,
+        )
+        return result.get("slides", [])
+
+    async def generate_mindmap(
+        self,
+        topic: str,
+        depth: int = 3,
+        language: str = "es",
+        additional_context: Optional[str] = None,
+        use_knowledge_base: bool = True,
+    ) -> Dict:
+        """Generate a mind map structure for a topic"""
+        knowledge_context = ""
+        if use_knowledge_base and language in ("pt", "es"):
+            knowledge_context = _knowledge_context_pt_es()
+        system_instruction = MINDMAP_SYSTEM_TEMPLATE.format(
+            language=language,
+            knowledge_context=knowledge_context,
+        )
+
+        prompt = MINDMAP_PROMPT_TEMPLATE.format(
+            topic=topic,
+            depth=depth,
+            additional_context=_context_line(additional_context),
+        )
+
         return await self.generate_json(prompt, system_instruction=system_instruction)
 
+    async def generate_podcast_script(
+        self,
+        topic: str,
+        style: str = "conversational",
+        duration_minutes: int = 10,
+        speakers: List[Dict] = None,
+        language: str = "es",
+        additional_context: Optional[str] = None,
+        use_knowledge_base: bool = True,
+    ) -> List[Dict]:
+        """Generate a podcast script with multiple speakers for Portuguese language learning"""
+        if speakers is None:
+            speakers = DEFAULT_PODCAST_SPEAKERS
+        speakers_desc, speakers_json = _format_speakers(
+            tuple(tuple(s.items()) for s in speakers)
+        )
+
+        # Use knowledge base context if enabled
+        knowledge_context = _knowledge_context() if use_knowledge_base else ""
+
+        system_instruction = PODCAST_SYSTEM_TEMPLATE.format(
+            knowledge_context=knowledge_context,
+            speakers_desc=speakers_desc,
+        )
+
+        prompt = PODCAST_PROMPT_TEMPLATE.format(
+            topic=topic,
+            duration_minutes=duration_minutes,
+            word_count=duration_minutes * 130,
+            style=style,
+            additional_context=_context_line(additional_context, prefix="- "),
+            speakers_json=speakers_json,
+        )
+
+        result = await self.generate_json(
+            prompt,
+            system_instruction=system_instruction,
+            response_model=GeneratedPodcastScript,
+        )
+        return result.get("segments", [])
+
+    async def generate_quiz_questions(
+        self,
+        topic: str,
+        num_questions: int = 5,
+        difficulty: str = "intermediate",
+        language: str = "es",
+    ) -> List[Dict]:
+        """Generate quiz questions for a topic"""
+        system_instruction = QUIZ_SYSTEM_TEMPLATE.format(
+            language=language,
+            difficulty=difficulty,
+        )
+
+        prompt = QUIZ_PROMPT_TEMPLATE.format(
+            topic=topic,
+            num_questions=num_questions,
+        )
+
+        result = await self.generate_json(
+            prompt,
+            system_instruction=system_instruction,
+            response_model=GeneratedQuiz,
+        )
+        return result.get("questions", [])
+
+    async def generate_video_prompt(
+        self,
+        topic: str,
+        style: str = "explainer",
+        duration_seconds: int = 60,
+        language: str = "es",
+        additional_context: Optional[str] = None,
+    ) -> Dict:
+        """Generate a detailed video generation prompt for Veo 3"""
+        system_instruction = VIDEO_SYSTEM_TEMPLATE.format(language=language)
+
+        prompt = VIDEO_PROMPT_TEMPLATE.format(
+            topic=topic,
+            style=style,
+            duration_seconds=duration_seconds,
+            additional_context=_context_line(additional_context),
+        )
+
+        return await self.generate_json(
+            prompt,
+            system_instruction=system_instruction,
+            response_model=GeneratedVideoPrompt,
+        )
+
+    @staticmethod
+    def _result_cache_key(
+        prompt: str,
+        output_format: str,
+        temperature: float,
+        max_tokens: int,
+        schema: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Hash the assembled prompt and generation config into a cache key"""
+        digest = hashlib.blake2b(prompt.encode("utf-8"), digest_size=32)
+        # The output format decides the response MIME type, so text and JSON
+        # answers to the same prompt must never share an entry
+        digest.update(f"|{output_format}|{temperature}|{max_tokens}|".encode("utf-8"))
+        if schema:
+            digest.update(orjson.dumps(schema, option=orjson.OPT_SORT_KEYS))
+        return digest.hexdigest()
+
+    def _get_cached_result(self, key: str) -> Optional[str]:
+        """Return the cached raw response text for a key, if still fresh"""
+        entry = self._result_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, text = entry
+        if time.monotonic() - stored_at >= self._result_cache_ttl_seconds:
+            del self._result_cache[key]
+            return None
+        return text
+
+    def _store_cached_result(self, key: str, text: str) -> None:
+        """Store a raw response text, evicting the oldest entry when full"""
+        if key not in self._result_cache and len(self._result_cache) >= self._result_cache_max_entries:
+            del self._result_cache[next(iter(self._result_cache))]
+        self._result_cache[key] = (time.monotonic(), text)
+
+    def clear_result_cache(self):
+        """Clear cached unified prompt results"""
+        self._result_cache = {}
+        logger.info("Gemini result cache cleared")
 
     # ============== UNIFIED PROMPT METHODS ==============
     # These methods use the configurable 3-layer prompt architecture
@@ -527,10 +825,16 @@ Responde en JSON:
         schema: Optional[Dict] = None,
         temperature: float = 0.7,
         max_tokens: int = 8192,
+        bypass_cache: bool = False,
+        hedged: bool = False,
     ) -> Any:
         """
         Generate content using the unified 3-layer prompt system.
 
+        Identical requests (same assembled prompt and generation config)
+        are served from an in-process cache for up to an hour, and
+        concurrent identical requests share a single Gemini call.
+
         Args:
             module: AI module (audio, presentation, mindmap, etc.)
             context: Generation context with topic, level, etc.
@@ -538,59 +842,104 @@ Responde en JSON:
             schema: Optional JSON schema for structured output
             temperature: Generation temperature
             max_tokens: Maximum output tokens
+            bypass_cache: Always call Gemini (e.g. explicit regeneration)
+            hedged: Send a backup request if the first one is slower than usual
 
         Returns:
             Generated content (dict for JSON, str for text)
         """
         from app.services.ai.unified_prompt_service import get_unified_prompt_service
 
+        if not context.tema or not context.tema.strip():
+            raise ValueError("A topic is required to generate content")
+
         await self._ensure_initialized()
 
         # Get assembled prompt from unified service
         prompt_service = get_unified_prompt_service()
         full_prompt = await prompt_service.assemble_prompt(module, context)
 
-        # Add output format instructions
-        if output_format == "json":
-            format_instruction = """
-IMPORTANTE: Responde ÚNICAMENTE con JSON válido.
-- No uses markdown (no ```json)
-- No agregues explicaciones antes o después del JSON
-- El JSON debe estar correctamente formateado
-"""
-            if schema:
-                format_instruction += f"\nEsquema esperado:\n{json.dumps(schema, indent=2, ensure_ascii=False)}"
+        # JSON mode guarantees bare JSON; only the expected shape needs describing
+        if output_format == "json" and schema:
+            full_prompt = f"{full_prompt}\n\nEsquema esperado:\n{orjson.dumps(schema).decode()}"
 
-            full_prompt = f"{full_prompt}\n\n{format_instruction}"
+        cache_key = self._result_cache_key(
+            full_prompt, output_format, temperature, max_tokens, schema if output_format == "json" else None
+        )
+        if not bypass_cache:
+            cached_text = self._get_cached_result(cache_key)
+            if cached_text is not None:
+                logger.info(f"Serving {module.value} content from result cache")
+                # Parse on every hit so callers never share mutable results
+                return orjson.loads(cached_text) if output_format == "json" else cached_text
+
+            # An identical request is already running: wait for its answer
+            while (pending := self._inflight.get(cache_key)) is not None:
+                logger.info(f"Joining in-flight {module.value} generation")
+                try:
+                    result_text = await asyncio.shield(pending)
+                except _InflightCancelled:
+                    # Its caller went away; run (or join) a fresh generation
+                    continue
+                return orjson.loads(result_text) if output_format == "json" else result_text
+
+        future = asyncio.get_running_loop().create_future()
+        if not bypass_cache:
+            self._inflight[cache_key] = future
 
+        try:
+            result, result_text = await self._generate_unified(
+                module, full_prompt, output_format, temperature, max_tokens, hedged
+            )
+        except asyncio.CancelledError:
+            # Only this caller was cancelled; joined callers retry on their own
+            future.set_exception(_InflightCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; joined callers still get it raised
+            raise
+        else:
+            future.set_result(result_text)
+        finally:
+            if self._inflight.get(cache_key) is future:
+                del self._inflight[cache_key]
+
+        self._store_cached_result(cache_key, result_text)
+        return result
+
+    async def _generate_unified(
+        self,
+        module: AIModule,
+        full_prompt: str,
+        output_format: str,
+        temperature: float,
+        max_tokens: int,
+        hedged: bool,
+    ) -> Tuple[Any, str]:
+        """Call Gemini for an assembled unified prompt, returning (result, raw text)"""
         logger.info(f"Generating {module.value} content with unified prompt ({len(full_prompt)} chars)")
 
         try:
-            response = self._client.models.generate_content(
-                model="gemini-2.0-flash",
-                contents=full_prompt,
-                config=types.GenerateContentConfig(
+            response = await self._generate(
+                full_prompt,
+                types.GenerateContentConfig(
                     temperature=temperature,
                     max_output_tokens=max_tokens,
-                )
+                    response_mime_type="application/json" if output_format == "json" else None,
+                ),
+                hedged=hedged,
             )
 
             result_text = response.text.strip()
 
             if output_format == "json":
-                # Clean up JSON response
-                if result_text.startswith("```json"):
-                    result_text = result_text[7:]
-                if result_text.startswith("```"):
-                    result_text = result_text[3:]
-                if result_text.endswith("```"):
-                    result_text = result_text[:-3]
+                return orjson.loads(result_text), result_text
 
-                return json.loads(result_text.strip())
+            return result_text, result_text
 
-            return result_text
-
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON response: {e}")
             raise ValueError(f"Invalid JSON response from Gemini: {e}")
         except Exception as e:
@@ -619,10 +968,7 @@ IMPORTANTE: Responde ÚNICAMENTE con JSON válido.
             Dict with title and segments
         """
         if speakers is None:
-            speakers = [
-                {"id": "host_male", "name": "Carlos", "role": "host"},
-                {"id": "host_female", "name": "Ana", "role": "expert"}
-            ]
+            speakers = DEFAULT_PODCAST_SPEAKERS
 
         context = GenerationContext(
             tema=topic,
@@ -636,24 +982,11 @@ IMPORTANTE: Responde ÚNICAMENTE con JSON válido.
             }
         )
 
-        schema = {
-            "title": "string",
-            "segments": [
-                {
-                    "order": "number",
-                    "speaker_id": "string",
-                    "speaker_name": "string",
-                    "text": "string",
-                    "duration_estimate": "number"
-                }
-            ]
-        }
-
         return await self.generate_with_unified_prompt(
             module=AIModule.PODCAST,
             context=context,
             output_format="json",
-            schema=schema,
+            schema=PODCAST_SCHEMA,
             temperature=0.8,
         )
 
@@ -796,13 +1129,7 @@ IMPORTANTE: Responde ÚNICAMENTE con JSON válido.
         )
 
 
-# Singleton instance
-_gemini_service: Optional[GeminiService] = None
-
-
+@functools.cache
 def get_gemini_service() -> GeminiService:
     """Get the Gemini service singleton"""
-    global _gemini_service
-    if _gemini_service is None:
-        _gemini_service = GeminiService()
-    return _gemini_service
+    return GeminiService()
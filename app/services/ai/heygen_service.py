@@ -2,9 +2,16 @@
 HeyGen Service
 Avatar video generation using HeyGen API
 """
+import asyncio
+import functools
+import hashlib
+import hmac
 import logging
+import random
+import time
 import httpx
-from typing import Optional, List, Dict, Any
+import orjson
+from typing import Optional, List, Dict, Any, Tuple, TypedDict
 from enum import Enum
 
 from app.config import settings
@@ -13,6 +20,21 @@ logger = logging.getLogger(__name__)
 
 HEYGEN_API_BASE = "https://api.heygen.com"
 
+# Endpoint URLs parsed once instead of on every request
+AVATARS_URL = httpx.URL(f"{HEYGEN_API_BASE}/v2/avatars")
+VOICES_URL = httpx.URL(f"{HEYGEN_API_BASE}/v2/voices")
+VIDEO_GENERATE_URL = httpx.URL(f"{HEYGEN_API_BASE}/v2/video/generate")
+VIDEO_STATUS_URL = httpx.URL(f"{HEYGEN_API_BASE}/v1/video_status.get")
+WEBHOOK_ADD_URL = httpx.URL(f"{HEYGEN_API_BASE}/v1/webhook/endpoint.add")
+QUOTA_URL = httpx.URL(f"{HEYGEN_API_BASE}/v1/video/get_remaining_quota")
+
+# Map aspect ratio to HeyGen dimension format
+DIMENSION_MAP = {
+    "16:9": {"width": 1920, "height": 1080},
+    "9:16": {"width": 1080, "height": 1920},
+    "1:1": {"width": 1080, "height": 1080},
+}
+
 
 class VideoStatus(str, Enum):
     PENDING = "pending"
@@ -21,31 +43,166 @@ class VideoStatus(str, Enum):
     FAILED = "failed"
 
 
+class AvatarEntry(TypedDict, total=False):
+    """Avatar or talking photo as returned by list_avatars"""
+    id: Optional[str]
+    name: str
+    type: str
+    preview_url: Optional[str]
+    gender: Optional[str]  # Avatars only
+
+
+class VoiceEntry(TypedDict):
+    """Voice as returned by list_voices"""
+    id: Optional[str]
+    name: str
+    language: Optional[str]
+    gender: Optional[str]
+    preview_url: Optional[str]
+    support_pause: bool
+    emotion_support: bool
+
+
+# Map HeyGen status to our status
+STATUS_MAP = {
+    "pending": VideoStatus.PENDING.value,
+    "processing": VideoStatus.PROCESSING.value,
+    "completed": VideoStatus.COMPLETED.value,
+    "failed": VideoStatus.FAILED.value,
+}
+
+FINISHED_STATUSES = frozenset({VideoStatus.COMPLETED.value, VideoStatus.FAILED.value})
+
+# HeyGen webhook event types mapped to our status
+WEBHOOK_EVENT_STATUS = {
+    "avatar_video.success": VideoStatus.COMPLETED.value,
+    "avatar_video.fail": VideoStatus.FAILED.value,
+}
+
+
 class HeyGenService:
     """Service for generating avatar videos with HeyGen API"""
 
+    _catalog_ttl_seconds = 600  # Avatars/voices change rarely
+    _quota_ttl_seconds = 30
+    _finished_status_ttl_seconds = 3600  # Completed/failed videos never change
+    _max_attempts = 4
+    _backoff_base_seconds = 0.5
+    _backoff_max_seconds = 8.0
+    _retryable_status_codes = frozenset({429, 500, 502, 503, 504})
+
     def __init__(self):
         self._api_key = settings.heygen_api_key
         self._initialized = False
+        self._client: Optional[httpx.AsyncClient] = None
+        # Projected API responses keyed by (method, args) -> (expires_at, value)
+        self._cache: Dict[Tuple[str, ...], Tuple[float, Any]] = {}
 
     def _ensure_initialized(self):
-        """Ensure API key is configured"""
-        if self._initialized:
-            return
+        """Ensure API key is configured and the shared HTTP client exists"""
         if not self._api_key:
             raise ValueError("HeyGen API key not configured. Set HEYGEN_API_KEY environment variable.")
-        self._initialized = True
-        logger.info("HeyGen Service initialized")
-
-    def _get_headers(self) -> Dict[str, str]:
-        """Get API request headers"""
-        return {
+        self._headers = {
             "X-Api-Key": self._api_key,
             "Content-Type": "application/json",
             "Accept": "application/json",
+            # The voice catalog is large; httpx decodes br via the brotli extra
+            "Accept-Encoding": "br, gzip",
         }
+        # One pooled client for all calls so TLS connections to HeyGen are reused.
+        # The transport retries failed connection attempts; HTTP-level errors
+        # are retried by _request.
+        self._client = httpx.AsyncClient(
+            base_url=HEYGEN_API_BASE,
+            headers=self._headers,
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            transport=httpx.AsyncHTTPTransport(
+                http2=True,
+                retries=3,
+                limits=httpx.Limits(
+                    max_keepalive_connections=20,
+                    max_connections=100,
+                    keepalive_expiry=60,
+                ),
+            ),
+        )
+        # Body-less GETs never change, so their requests are built once and resent
+        self._avatars_request = self._client.build_request("GET", AVATARS_URL)
+        self._voices_request = self._client.build_request("GET", VOICES_URL)
+        self._quota_request = self._client.build_request("GET", QUOTA_URL)
+        self._initialized = True
+        # Later calls resolve to the no-op instance attribute, skipping the checks
+        self._ensure_initialized = self._already_initialized
+        logger.info("HeyGen Service initialized")
+
+    @staticmethod
+    def _already_initialized():
+        """Stand-in for _ensure_initialized once the client exists"""
+
+    async def aclose(self):
+        """Close the shared HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._initialized = False
+            # Restore the class method so the next call rebuilds the client
+            del self._ensure_initialized
+
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        """Seconds to wait before retrying: Retry-After if sent, else jittered backoff"""
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self._backoff_max_seconds)
+        delay = self._backoff_base_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+        return min(delay, self._backoff_max_seconds)
+
+    async def _request(self, method: str, url: httpx.URL, idempotent: bool = True, **kwargs) -> Dict[str, Any]:
+        """Build a request to HeyGen, send it with retries and decode the JSON body"""
+        request = self._client.build_request(method, url, **kwargs)
+        return await self._send(request, idempotent)
+
+    async def _send(self, request: httpx.Request, idempotent: bool = True) -> Dict[str, Any]:
+        """
+        Send a request to HeyGen and decode the JSON body
 
-    async def list_avatars(self) -> List[Dict[str, Any]]:
+        Rate limits (429) are always retried with backoff. Server errors are
+        retried only for idempotent requests, so a POST that may have been
+        accepted is never submitted twice.
+        """
+        for attempt in range(self._max_attempts):
+            response = await self._client.send(request)
+            code = response.status_code
+            retryable = code == 429 or (idempotent and code in self._retryable_status_codes)
+            if not retryable or attempt == self._max_attempts - 1:
+                break
+            delay = self._retry_delay(response, attempt)
+            logger.warning(f"HeyGen returned {code} for {request.url.path}, retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    def _get_cached(self, key: Tuple[str, ...]) -> Optional[Any]:
+        """Return a cached value if it hasn't expired"""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._cache[key]
+            return None
+        return value
+
+    def _set_cached(self, key: Tuple[str, ...], value: Any, ttl_seconds: int):
+        """Cache a value for ttl_seconds"""
+        self._cache[key] = (time.monotonic() + ttl_seconds, value)
+
+    def invalidate_catalog(self):
+        """Drop cached avatars, voices and quota so the next call refetches"""
+        self._cache = {}
+        logger.info("HeyGen catalog cache cleared")
+
+    async def list_avatars(self) -> List[AvatarEntry]:
         """
         List available HeyGen avatars
 
@@ -54,38 +211,39 @@ class HeyGenService:
         """
         self._ensure_initialized()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{HEYGEN_API_BASE}/v2/avatars",
-                headers=self._get_headers(),
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            avatars = []
-            # Process talking photos
-            for avatar in data.get("data", {}).get("talking_photos", []):
-                avatars.append({
-                    "id": avatar.get("talking_photo_id"),
-                    "name": avatar.get("talking_photo_name", "Talking Photo"),
-                    "type": "talking_photo",
-                    "preview_url": avatar.get("preview_image_url"),
-                })
-
-            # Process avatars
-            for avatar in data.get("data", {}).get("avatars", []):
-                avatars.append({
-                    "id": avatar.get("avatar_id"),
-                    "name": avatar.get("avatar_name", "Avatar"),
-                    "type": "avatar",
-                    "preview_url": avatar.get("preview_image_url"),
-                    "gender": avatar.get("gender"),
-                })
-
-            return avatars
-
-    async def list_voices(self, language: str = "pt") -> List[Dict[str, Any]]:
+        cached = self._get_cached(("avatars",))
+        if cached is not None:
+            return list(cached)
+
+        data = await self._send(self._avatars_request)
+
+        raw = data.get("data") or {}
+
+        # Talking photos first, then avatars
+        avatars: List[AvatarEntry] = [
+            {
+                "id": avatar.get("talking_photo_id"),
+                "name": avatar.get("talking_photo_name", "Talking Photo"),
+                "type": "talking_photo",
+                "preview_url": avatar.get("preview_image_url"),
+            }
+            for avatar in raw.get("talking_photos", [])
+        ]
+        avatars.extend(
+            {
+                "id": avatar.get("avatar_id"),
+                "name": avatar.get("avatar_name", "Avatar"),
+                "type": "avatar",
+                "preview_url": avatar.get("preview_image_url"),
+                "gender": avatar.get("gender"),
+            }
+            for avatar in raw.get("avatars", [])
+        )
+
+        self._set_cached(("avatars",), avatars, self._catalog_ttl_seconds)
+        return list(avatars)
+
+    async def list_voices(self, language: str = "pt") -> List[VoiceEntry]:
         """
         List available HeyGen voices
 
@@ -97,33 +255,49 @@ class HeyGenService:
         """
         self._ensure_initialized()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{HEYGEN_API_BASE}/v2/voices",
-                headers=self._get_headers(),
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            voices = []
-            for voice in data.get("data", {}).get("voices", []):
-                voice_lang = voice.get("language", "").lower()
-                # Filter by language if specified
-                if language and not voice_lang.startswith(language.lower()):
-                    continue
-
-                voices.append({
-                    "id": voice.get("voice_id"),
-                    "name": voice.get("name", voice.get("display_name", "Voice")),
-                    "language": voice.get("language"),
-                    "gender": voice.get("gender"),
-                    "preview_url": voice.get("preview_audio"),
-                    "support_pause": voice.get("support_pause", False),
-                    "emotion_support": voice.get("emotion_support", False),
-                })
-
-            return voices
+        cache_key = ("voices", language or "")
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return list(cached)
+
+        by_language = await self._get_voices_by_language()
+        # Filter by language if specified; match against the few distinct
+        # languages rather than every voice
+        lang = language.lower() if language else None
+        voices = [
+            voice
+            for voice_language, bucket in by_language.items()
+            if lang is None or voice_language.startswith(lang)
+            for voice in bucket
+        ]
+
+        self._set_cached(cache_key, voices, self._catalog_ttl_seconds)
+        return list(voices)
+
+    async def _get_voices_by_language(self) -> Dict[str, List[VoiceEntry]]:
+        """Fetch the voice catalog once per TTL, grouped by lowercased language"""
+        cached = self._get_cached(("voices_by_language",))
+        if cached is not None:
+            return cached
+
+        data = await self._send(self._voices_request)
+        raw = data.get("data") or {}
+
+        by_language: Dict[str, List[VoiceEntry]] = {}
+        for voice in raw.get("voices", []):
+            voice_language = voice.get("language") or ""
+            by_language.setdefault(voice_language.lower(), []).append({
+                "id": voice.get("voice_id"),
+                "name": voice.get("name", voice.get("display_name", "Voice")),
+                "language": voice.get("language"),
+                "gender": voice.get("gender"),
+                "preview_url": voice.get("preview_audio"),
+                "support_pause": voice.get("support_pause", False),
+                "emotion_support": voice.get("emotion_support", False),
+            })
+
+        self._set_cached(("voices_by_language",), by_language, self._catalog_ttl_seconds)
+        return by_language
 
     async def generate_video(
         self,
@@ -152,13 +326,7 @@ class HeyGenService:
         """
         self._ensure_initialized()
 
-        # Map aspect ratio to HeyGen dimension format
-        dimension_map = {
-            "16:9": {"width": 1920, "height": 1080},
-            "9:16": {"width": 1080, "height": 1920},
-            "1:1": {"width": 1080, "height": 1080},
-        }
-        dimensions = dimension_map.get(aspect_ratio, dimension_map["16:9"])
+        dimensions = DIMENSION_MAP.get(aspect_ratio, DIMENSION_MAP["16:9"])
 
         payload = {
             "video_inputs": [
@@ -187,26 +355,24 @@ class HeyGenService:
 
         logger.info(f"Generating HeyGen video: {title} with avatar {avatar_id}")
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{HEYGEN_API_BASE}/v2/video/generate",
-                headers=self._get_headers(),
-                json=payload,
-                timeout=60.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("error"):
-                raise Exception(f"HeyGen API error: {data.get('error')}")
-
-            video_id = data.get("data", {}).get("video_id")
-            logger.info(f"HeyGen video generation started: {video_id}")
-
-            return {
-                "video_id": video_id,
-                "status": VideoStatus.PENDING.value,
-            }
+        data = await self._request(
+            "POST",
+            VIDEO_GENERATE_URL,
+            idempotent=False,
+            content=orjson.dumps(payload),
+            timeout=60.0,
+        )
+
+        if data.get("error"):
+            raise Exception(f"HeyGen API error: {data.get('error')}")
+
+        video_id = data.get("data", {}).get("video_id")
+        logger.info(f"HeyGen video generation started: {video_id}")
+
+        return {
+            "video_id": video_id,
+            "status": VideoStatus.PENDING.value,
+        }
 
     async def get_video_status(self, video_id: str) -> Dict[str, Any]:
         """
@@ -220,39 +386,129 @@ class HeyGenService:
         """
         self._ensure_initialized()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{HEYGEN_API_BASE}/v1/video_status.get",
-                params={"video_id": video_id},
-                headers=self._get_headers(),
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("error"):
-                raise Exception(f"HeyGen API error: {data.get('error')}")
-
-            status_data = data.get("data", {})
-            heygen_status = status_data.get("status", "pending")
-
-            # Map HeyGen status to our status
-            status_map = {
-                "pending": VideoStatus.PENDING.value,
-                "processing": VideoStatus.PROCESSING.value,
-                "completed": VideoStatus.COMPLETED.value,
-                "failed": VideoStatus.FAILED.value,
-            }
+        # Finished videos (reported by webhook or a previous poll) need no request
+        finished = self._get_cached(("status", video_id))
+        if finished is not None:
+            return dict(finished)
+
+        data = await self._request(
+            "GET",
+            VIDEO_STATUS_URL,
+            params={"video_id": video_id},
+        )
+
+        if data.get("error"):
+            raise Exception(f"HeyGen API error: {data.get('error')}")
+
+        status_data = data.get("data", {})
+        heygen_status = status_data.get("status", "pending")
+
+        result = {
+            "video_id": video_id,
+            "status": STATUS_MAP.get(heygen_status, VideoStatus.PENDING.value),
+            "video_url": status_data.get("video_url"),
+            "thumbnail_url": status_data.get("thumbnail_url"),
+            "duration": status_data.get("duration"),
+            "gif_url": status_data.get("gif_url"),
+            "error": status_data.get("error"),
+        }
+        if result["status"] in FINISHED_STATUSES:
+            self._set_cached(("status", video_id), result, self._finished_status_ttl_seconds)
+        return result
 
-            return {
-                "video_id": video_id,
-                "status": status_map.get(heygen_status, VideoStatus.PENDING.value),
-                "video_url": status_data.get("video_url"),
-                "thumbnail_url": status_data.get("thumbnail_url"),
-                "duration": status_data.get("duration"),
-                "gif_url": status_data.get("gif_url"),
-                "error": status_data.get("error"),
-            }
+    async def register_webhook(self, url: str, events: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Register a webhook endpoint so HeyGen pushes video completion events
+
+        Args:
+            url: Public URL of our HeyGen webhook endpoint
+            events: Event types to subscribe to (defaults to success and failure)
+
+        Returns:
+            Endpoint registration data, including the signing secret
+        """
+        self._ensure_initialized()
+
+        payload = {"url": url, "events": events or list(WEBHOOK_EVENT_STATUS)}
+        data = await self._request(
+            "POST",
+            WEBHOOK_ADD_URL,
+            idempotent=False,
+            content=orjson.dumps(payload),
+        )
+
+        if data.get("error"):
+            raise Exception(f"HeyGen API error: {data.get('error')}")
+
+        logger.info(f"HeyGen webhook registered for {url}")
+        return data.get("data", {})
+
+    @staticmethod
+    def verify_webhook_signature(body: bytes, signature: Optional[str]) -> bool:
+        """Check the HMAC-SHA256 signature HeyGen sends with each webhook"""
+        secret = settings.heygen_webhook_secret
+        if not secret or not signature:
+            return False
+        expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature)
+
+    async def handle_webhook_event(self, event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Record a video completion event pushed by HeyGen
+
+        Args:
+            event: Decoded webhook body with event_type and event_data
+
+        Returns:
+            Status object for the video, or None for events we don't track
+        """
+        status = WEBHOOK_EVENT_STATUS.get(event.get("event_type"))
+        event_data = event.get("event_data") or {}
+        video_id = event_data.get("video_id")
+        if status is None or not video_id:
+            return None
+
+        # The event carries only the video URL; one status request fills in
+        # thumbnail and duration (and caches the finished status).
+        try:
+            fetched = await self.get_video_status(video_id)
+        except Exception as e:
+            logger.warning(f"Could not fetch HeyGen status for {video_id} after webhook: {e}")
+            fetched = None
+
+        if fetched is not None and fetched["status"] in FINISHED_STATUSES:
+            return fetched
+
+        # The status API can lag behind the event; the event's outcome wins
+        fetched = fetched or {}
+        result = {
+            "video_id": video_id,
+            "status": status,
+            "video_url": fetched.get("video_url") or event_data.get("url"),
+            "thumbnail_url": fetched.get("thumbnail_url"),
+            "duration": fetched.get("duration"),
+            "gif_url": fetched.get("gif_url") or event_data.get("gif_download_url"),
+            "error": fetched.get("error") or event_data.get("msg"),
+        }
+        self._set_cached(("status", video_id), result, self._finished_status_ttl_seconds)
+
+        return result
+
+    async def get_video_statuses(self, video_ids: List[str]) -> List[Any]:
+        """
+        Get the status of several videos concurrently over the shared client
+
+        Args:
+            video_ids: HeyGen video IDs
+
+        Returns:
+            One entry per video ID, in order: a status object as returned by
+            get_video_status, or the exception raised while fetching it
+        """
+        return await asyncio.gather(
+            *(self.get_video_status(video_id) for video_id in video_ids),
+            return_exceptions=True,
+        )
 
     async def get_remaining_quota(self) -> Dict[str, Any]:
         """
@@ -263,25 +519,18 @@ class HeyGenService:
         """
         self._ensure_initialized()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{HEYGEN_API_BASE}/v1/video/get_remaining_quota",
-                headers=self._get_headers(),
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            return data.get("data", {})
+        cached = self._get_cached(("quota",))
+        if cached is not None:
+            return dict(cached)
 
+        data = await self._send(self._quota_request)
 
-# Singleton instance
-_heygen_service: Optional[HeyGenService] = None
+        quota = data.get("data", {})
+        self._set_cached(("quota",), quota, self._quota_ttl_seconds)
+        return dict(quota)
 
 
+@functools.cache
 def get_heygen_service() -> HeyGenService:
     """Get the HeyGen service singleton"""
-    global _heygen_service
-    if _heygen_service is None:
-        _heygen_service = HeyGenService()
-    return _heygen_service
+    return HeyGenService()
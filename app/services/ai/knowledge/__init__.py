@@ -4,7 +4,6 @@ Contains master prompts and templates for educational content.
 """
 
 from .master_prompt import (
-    MASTER_PROMPT,
     get_master_prompt,
     get_audio_prompt,
     get_presentation_prompt,
@@ -17,7 +16,6 @@ from .master_prompt import (
 )
 
 __all__ = [
-    "MASTER_PROMPT",
     "get_master_prompt",
     "get_audio_prompt",
     "get_presentation_prompt",
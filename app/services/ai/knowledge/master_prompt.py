@@ -3,323 +3,10 @@ PROMPT MAESTRO - AI STUDIO
 Base de conocimiento para la generación de contenido educativo del curso de Portugués Brasileño
 para estudiantes peruanos del Instituto IDECAP.
 """
-
-MASTER_PROMPT = """
-# PROMPT MAESTRO - AI STUDIO IDECAP
-
-## 1. CONTEXTO EDUCATIVO
-
-### Audiencia Objetivo
-- **Estudiantes**: Adultos peruanos hispanohablantes
-- **Nivel**: Principiante a intermedio
-- **Curso**: Portugués Brasileño para negocios y comunicación
-- **Instituto**: IDECAP (Instituto de Desarrollo de Capacidades)
-
-### Objetivos de Aprendizaje
-- Desarrollar competencias comunicativas en portugués brasileño
-- Superar las dificultades específicas de hispanohablantes
-- Aplicar el idioma en contextos profesionales y cotidianos
-- Distinguir los "falsos amigos" entre español y portugués
-
----
-
-## 2. FALSOS AMIGOS (ESPAÑOL - PORTUGUÉS)
-
-### Tabla de Referencia Esencial
-
-| Español | Portugués | Significado Real en Portugués |
-|---------|-----------|-------------------------------|
-| Embarazada | Grávida | "Embaraçada" = Avergonzada |
-| Exquisito | Delicioso/Requintado | "Esquisito" = Raro/Extraño |
-| Largo | Comprido/Longo | "Largo" = Ancho |
-| Borrar | Apagar | "Borrar" = Manchar |
-| Vaso | Copo | "Vaso" = Florero/Jarrón |
-| Polvo | Pó | "Polvo" = Pulpo |
-| Oficina | Escritório | "Oficina" = Taller mecánico |
-| Salsa | Molho | "Salsa" = Perejil |
-| Taza | Xícara | "Taça" = Copa |
-| Rato | Momento | "Rato" = Ratón |
-| Apellido | Sobrenome | "Apelido" = Apodo |
-| Firma | Assinatura | "Firma" = Empresa |
-| Acordar | Combinar | "Acordar" = Despertar |
-| Contestar | Responder | "Contestar" = Cuestionar |
-| Presunto | Suposto | "Presunto" = Jamón |
-| Propina | Gorjeta | "Propina" = Soborno |
-| Rojo | Vermelho | "Roxo" = Morado |
-| Pegar | Colar/Grudar | "Pegar" = Agarrar/Tomar |
-| Tirar | Jogar/Arremessar | "Tirar" = Quitar/Sacar |
-| Escoba | Vassoura | "Escova" = Cepillo |
-
-### Consejos de Uso
-- Siempre incluir ejemplos contextuales de falsos amigos en el contenido
-- Crear situaciones donde el error sea evidente para reforzar el aprendizaje
-- Usar comparaciones humorísticas para hacer memorable el contenido
-
----
-
-## 3. DIFERENCIAS FONÉTICAS
-
-### Sonidos Clave del Portugués Brasileño
-
-#### Vocales Nasales
-- **ã, ão, õe**: No existen en español
-- Ejemplo: "não" (no), "coração" (corazón), "pão" (pan)
-
-#### Consonantes Especiales
-- **lh**: Similar a "ll" en español rioplatense → "filho" (hijo)
-- **nh**: Similar a "ñ" en español → "amanhã" (mañana)
-- **r** inicial o doble: Sonido gutural → "carro" (carro)
-- **r** final: Casi mudo o aspirado → "amor"
-- **s** final: Como "sh" en algunas regiones → "mas"
-- **t** antes de "i": Como "tch" → "tia" (tía)
-- **d** antes de "i": Como "dj" → "dia" (día)
-
-#### Acentuación
-- El portugués tiene más variedad de acentos gráficos
-- Circunflejo (ê, ô): Vocal cerrada
-- Acento agudo (á, é, ó): Vocal abierta
-- Til (ã, õ): Nasalización
-
----
-
-## 4. ESTÁNDARES DE CONTENIDO
-
-### Estructura General
-1. **Introducción** (10%): Contexto y objetivos
-2. **Desarrollo** (70%): Contenido principal con ejemplos
-3. **Práctica** (15%): Ejercicios o aplicación
-4. **Resumen** (5%): Puntos clave
-
-### Tono y Estilo
-- **Profesional pero accesible**: Evitar jerga excesiva
-- **Motivador**: Reconocer los desafíos de aprender un idioma similar
-- **Práctico**: Siempre orientado a la aplicación real
-- **Cultural**: Incluir aspectos de la cultura brasileña
-
-### Requisitos de Calidad
-- Contenido 100% en el idioma objetivo (portugués) con traducciones cuando sea necesario
-- Pronunciación indicada entre corchetes: [pro-nun-si-a-ção]
-- Ejemplos relevantes para el contexto profesional peruano
-- Progresión de dificultad clara
-
----
-
-## 5. FORMATOS POR MÓDULO
-
-### 5.1 AUDIO TTS (Texto a Voz)
-
-**Propósito**: Crear diálogos y textos para práctica de comprensión auditiva y pronunciación.
-
-**Estructura**:
-```
-[TÍTULO DEL AUDIO]
-Tema: [tema específico]
-Nivel: [básico/intermedio/avanzado]
-Duración estimada: [X minutos]
-
----
-
-[CONTEXTO]
-Breve descripción de la situación
-
----
-
-[DIÁLOGO/TEXTO]
-Personaje 1: "Texto en portugués" [pronunciación si es compleja]
-Personaje 2: "Respuesta en portugués"
-
----
-
-[VOCABULARIO CLAVE]
-- Palabra 1: significado en español
-- Palabra 2: significado en español
-
----
-
-[NOTA CULTURAL] (opcional)
-Información cultural relevante
-```
-
-**Voces Disponibles**:
-- Español: Dalia (femenina), Jorge (masculina)
-- Portugués Brasileño: Francisca (femenina), Antônio (masculino)
-
-### 5.2 PRESENTACIONES
-
-**Propósito**: Material visual para explicar gramática, vocabulario o cultura.
-
-**Estructura**:
-```
-[TÍTULO DE LA PRESENTACIÓN]
-Tema: [tema]
-Diapositivas: [número]
-Nivel: [básico/intermedio/avanzado]
-
----
-
-DIAPOSITIVA 1: [Título]
-- Contenido principal
-- Punto clave 1
-- Punto clave 2
-[Nota del presentador: sugerencia de explicación]
-
-DIAPOSITIVA 2: [Título]
-...
-
----
-
-[RESUMEN FINAL]
-Puntos principales a recordar
-```
-
-### 5.3 MAPAS MENTALES
-
-**Propósito**: Organizar visualmente conceptos relacionados.
-
-**Estructura**:
-```
-[TEMA CENTRAL]
-│
-├── RAMA 1: [Categoría]
-│   ├── Sub-tema 1.1
-│   ├── Sub-tema 1.2
-│   └── Sub-tema 1.3
-│
-├── RAMA 2: [Categoría]
-│   ├── Sub-tema 2.1
-│   └── Sub-tema 2.2
-│
-└── RAMA 3: [Categoría]
-    ├── Sub-tema 3.1
-    └── Sub-tema 3.2
-
-[CONEXIONES]
-- Tema 1.1 ↔ Tema 2.1: [relación]
-```
-
-### 5.4 PODCASTS
-
-**Propósito**: Contenido educativo en formato conversacional.
-
-**Estructura**:
-```
-[TÍTULO DEL PODCAST]
-Episodio: [número y nombre]
-Duración: [X minutos]
-Participantes: [nombres/roles]
-
----
-
-[INTRO] (30 segundos)
-Música de entrada + presentación del tema
-
----
-
-[SEGMENTO 1: Introducción al tema] (2-3 minutos)
-Presentador: "Texto introductorio..."
-
-[SEGMENTO 2: Desarrollo] (5-7 minutos)
-Diálogo entre participantes con ejemplos
-
-[SEGMENTO 3: Práctica/Tips] (2-3 minutos)
-Consejos prácticos y ejercicios sugeridos
-
----
-
-[OUTRO] (30 segundos)
-Resumen y despedida
-
----
-
-[NOTAS DE PRODUCCIÓN]
-- Efectos de sonido sugeridos
-- Pausas para práctica del oyente
-```
-
-### 5.5 VIDEOS
-
-**Propósito**: Contenido multimedia con visual y audio.
-
-**Estructura**:
-```
-[TÍTULO DEL VIDEO]
-Duración: [X minutos]
-Tipo: [tutorial/clase/documental/sketch]
-
----
-
-[GUIÓN]
-
-ESCENA 1: [Descripción visual]
-Tiempo: 00:00 - 00:30
-Visual: [descripción de lo que se ve]
-Audio/Narración: "Texto del narrador o diálogo"
-Texto en pantalla: [si aplica]
-
-ESCENA 2: ...
-
----
-
-[RECURSOS NECESARIOS]
-- Gráficos: [lista]
-- Música: [sugerencias]
-- Imágenes: [descripción]
-```
-
----
-
-## 6. CHECKLIST DE CALIDAD
-
-Antes de finalizar cualquier contenido, verificar:
-
-### Contenido
-- [ ] El tema está claramente definido
-- [ ] El nivel de dificultad es apropiado
-- [ ] Incluye ejemplos relevantes para peruanos
-- [ ] Los falsos amigos están correctamente identificados
-- [ ] La pronunciación está indicada donde es necesario
-
-### Formato
-- [ ] Sigue la estructura del módulo correspondiente
-- [ ] La duración/extensión es apropiada
-- [ ] Las instrucciones de producción son claras
-
-### Pedagogía
-- [ ] El objetivo de aprendizaje está claro
-- [ ] Hay progresión lógica del contenido
-- [ ] Incluye oportunidades de práctica
-- [ ] El cierre refuerza los puntos clave
-
-### Cultural
-- [ ] El contenido es culturalmente sensible
-- [ ] Incluye aspectos de la cultura brasileña
-- [ ] Evita estereotipos
-
----
-
-## 7. COMANDO DE GENERACIÓN
-
-Para generar contenido, usar el siguiente formato:
-
-```
-GENERAR [TIPO_CONTENIDO]
-Tema: [tema específico]
-Nivel: [básico/intermedio/avanzado]
-Duración: [tiempo estimado]
-Enfoque especial: [gramática/vocabulario/pronunciación/cultura]
-Contexto: [situación específica, ej: "reunión de negocios"]
-```
-
-### Ejemplo:
-```
-GENERAR AUDIO_TTS
-Tema: Presentarse en una reunión de trabajo
-Nivel: básico
-Duración: 3 minutos
-Enfoque especial: vocabulario profesional
-Contexto: Primera reunión con colegas brasileños
-```
-"""
+import functools
+import string
+from importlib import resources
+from typing import Callable
 
 # Templates individuales para cada tipo de contenido
 AUDIO_TTS_TEMPLATE = """
@@ -430,9 +117,38 @@ RECURSOS SUGERIDOS:
 - Imágenes de {imagenes}
 """
 
+def _compile_template(template: str) -> Callable[..., str]:
+    """
+    Pre-parse a str.format template into (literal, field) pairs once at import.
+
+    Rendering then only joins the pieces, instead of re-parsing the
+    template on every call like str.format does.
+    """
+    parts = [
+        (literal, field)
+        for literal, field, _, _ in string.Formatter().parse(template)
+    ]
+
+    def render(**values) -> str:
+        return "".join([
+            literal if field is None else f"{literal}{values[field]}"
+            for literal, field in parts
+        ])
+
+    return render
+
+
+_render_audio_tts = _compile_template(AUDIO_TTS_TEMPLATE)
+_render_presentation = _compile_template(PRESENTATION_TEMPLATE)
+_render_mindmap = _compile_template(MINDMAP_TEMPLATE)
+_render_podcast = _compile_template(PODCAST_TEMPLATE)
+_render_video = _compile_template(VIDEO_TEMPLATE)
+
+
+@functools.lru_cache(maxsize=1)
 def get_master_prompt() -> str:
-    """Retorna el prompt maestro completo."""
-    return MASTER_PROMPT
+    """Retorna el prompt maestro completo (leído de master_prompt.txt en el primer uso)."""
+    return resources.files(__package__).joinpath("master_prompt.txt").read_text(encoding="utf-8")
 
 def get_audio_prompt(
     tema: str,
@@ -442,7 +158,7 @@ def get_audio_prompt(
     voz_pt: str = "Francisca"
 ) -> str:
     """Genera el prompt para contenido de Audio TTS."""
-    return AUDIO_TTS_TEMPLATE.format(
+    return _render_audio_tts(
         tema=tema,
         nivel=nivel,
         contexto=contexto or f"Situación cotidiana relacionada con {tema}",
@@ -457,7 +173,7 @@ def get_presentation_prompt(
     enfoque: str = "vocabulario"
 ) -> str:
     """Genera el prompt para presentaciones."""
-    return PRESENTATION_TEMPLATE.format(
+    return _render_presentation(
         tema=tema,
         nivel=nivel,
         num_slides=num_slides,
@@ -472,7 +188,7 @@ def get_mindmap_prompt(
     enfoque: str = "vocabulario relacionado"
 ) -> str:
     """Genera el prompt para mapas mentales."""
-    return MINDMAP_TEMPLATE.format(
+    return _render_mindmap(
         tema=tema,
         nivel=nivel,
         enfoque=enfoque
@@ -487,7 +203,7 @@ def get_podcast_prompt(
 ) -> str:
     """Genera el prompt para podcasts."""
     desarrollo_min = duracion - 5  # Resto del tiempo después de intro, práctica y outro
-    return PODCAST_TEMPLATE.format(
+    return _render_podcast(
         tema=tema,
         nivel=nivel,
         duracion=duracion,
@@ -504,7 +220,7 @@ def get_video_prompt(
 ) -> str:
     """Genera el prompt para videos."""
     contenido_principal_min = duracion - 2  # Tiempo restante después de intro y outro
-    return VIDEO_TEMPLATE.format(
+    return _render_video(
         tema=tema,
         nivel=nivel,
         tipo_video=tipo_video,
@@ -528,13 +244,13 @@ VOICES = {
 }
 
 # Niveles de dificultad
-LEVELS = ["básico", "intermedio", "avanzado"]
+LEVELS = ("básico", "intermedio", "avanzado")
 
 # Tipos de contenido
-CONTENT_TYPES = [
+CONTENT_TYPES = (
     "audio_tts",
     "presentation",
     "mindmap",
     "podcast",
     "video"
-]
+)
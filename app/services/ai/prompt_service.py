@@ -3,8 +3,9 @@ Prompt Service for AI Studio Content Generation
 Provides prompts based on the master knowledge base for educational content.
 """
 
+import functools
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from enum import Enum
 
 from app.services.ai.knowledge import (
@@ -30,6 +31,28 @@ class ContentType(str, Enum):
     VIDEO = "video"
 
 
+@functools.lru_cache(maxsize=8)
+def _build_system_prompt(master_prompt: str, content_type_value: Optional[str]) -> str:
+    """Build the system prompt once per (master prompt, content type)"""
+    base_prompt = f"""Eres un experto en la creación de contenido educativo para la enseñanza
+de portugués brasileño a estudiantes hispanohablantes peruanos.
+
+{master_prompt}
+
+IMPORTANTE:
+- Todo el contenido debe ser apropiado para estudiantes adultos
+- Mantén un tono profesional pero accesible
+- Incluye siempre ejemplos prácticos
+- Destaca los falsos amigos cuando sean relevantes
+- Indica la pronunciación de palabras difíciles
+"""
+
+    if content_type_value:
+        base_prompt += f"\n\nESTÁS GENERANDO CONTENIDO DE TIPO: {content_type_value.upper()}"
+
+    return base_prompt
+
+
 class PromptService:
     """Service for generating educational content prompts."""
 
@@ -51,23 +74,10 @@ class PromptService:
         Returns:
             System prompt with master prompt and specific guidelines
         """
-        base_prompt = f"""Eres un experto en la creación de contenido educativo para la enseñanza
-de portugués brasileño a estudiantes hispanohablantes peruanos.
-
-{self._master_prompt}
-
-IMPORTANTE:
-- Todo el contenido debe ser apropiado para estudiantes adultos
-- Mantén un tono profesional pero accesible
-- Incluye siempre ejemplos prácticos
-- Destaca los falsos amigos cuando sean relevantes
-- Indica la pronunciación de palabras difíciles
-"""
-
-        if content_type:
-            base_prompt += f"\n\nESTÁS GENERANDO CONTENIDO DE TIPO: {content_type.value.upper()}"
-
-        return base_prompt
+        return _build_system_prompt(
+            self._master_prompt,
+            content_type.value if content_type else None,
+        )
 
     def generate_content_prompt(
         self,
@@ -91,45 +101,44 @@ IMPORTANTE:
         if nivel not in LEVELS:
             nivel = "básico"
 
-        prompt_generators = {
-            ContentType.AUDIO_TTS: lambda: get_audio_prompt(
+        if content_type == ContentType.AUDIO_TTS:
+            return get_audio_prompt(
                 tema=tema,
                 nivel=nivel,
                 contexto=kwargs.get("contexto", ""),
                 voz_es=kwargs.get("voz_es", VOICES["es"]["female"]),
                 voz_pt=kwargs.get("voz_pt", VOICES["pt"]["female"])
-            ),
-            ContentType.PRESENTATION: lambda: get_presentation_prompt(
+            )
+        if content_type == ContentType.PRESENTATION:
+            return get_presentation_prompt(
                 tema=tema,
                 nivel=nivel,
                 num_slides=kwargs.get("num_slides", 10),
                 enfoque=kwargs.get("enfoque", "vocabulario")
-            ),
-            ContentType.MINDMAP: lambda: get_mindmap_prompt(
+            )
+        if content_type == ContentType.MINDMAP:
+            return get_mindmap_prompt(
                 tema=tema,
                 nivel=nivel,
                 enfoque=kwargs.get("enfoque", "vocabulario relacionado")
-            ),
-            ContentType.PODCAST: lambda: get_podcast_prompt(
+            )
+        if content_type == ContentType.PODCAST:
+            return get_podcast_prompt(
                 tema=tema,
                 nivel=nivel,
                 duracion=kwargs.get("duracion", 10),
                 formato=kwargs.get("formato", "conversacional"),
                 participante_adicional=kwargs.get("participante", "Invitado experto")
-            ),
-            ContentType.VIDEO: lambda: get_video_prompt(
+            )
+        if content_type == ContentType.VIDEO:
+            return get_video_prompt(
                 tema=tema,
                 nivel=nivel,
                 tipo_video=kwargs.get("tipo_video", "tutorial"),
                 duracion=kwargs.get("duracion", 5)
-            ),
-        }
+            )
 
-        generator = prompt_generators.get(content_type)
-        if generator:
-            return generator()
-        else:
-            raise ValueError(f"Unknown content type: {content_type}")
+        raise ValueError(f"Unknown content type: {content_type}")
 
     def get_voices(self, language: str = "pt") -> Dict[str, str]:
         """
@@ -143,22 +152,16 @@ IMPORTANTE:
         """
         return VOICES.get(language, VOICES["pt"])
 
-    def get_available_levels(self) -> list:
-        """Get list of available difficulty levels."""
-        return LEVELS.copy()
-
-    def get_available_content_types(self) -> list:
-        """Get list of available content types."""
-        return CONTENT_TYPES.copy()
-
+    def get_available_levels(self) -> Tuple[str, ...]:
+        """Get available difficulty levels (shared, immutable)."""
+        return LEVELS
 
-# Singleton instance
-_prompt_service: Optional[PromptService] = None
+    def get_available_content_types(self) -> Tuple[str, ...]:
+        """Get available content types (shared, immutable)."""
+        return CONTENT_TYPES
 
 
+@functools.cache
 def get_prompt_service() -> PromptService:
     """Get the singleton prompt service instance."""
-    global _prompt_service
-    if _prompt_service is None:
-        _prompt_service = PromptService()
-    return _prompt_service
+    return PromptService()
@@ -2,8 +2,14 @@
 Google Cloud Translation API Service
 Provides translation between Spanish and Portuguese for the language course
 """
+import asyncio
+import functools
+import hashlib
 import logging
-from typing import Optional, Tuple
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple, List, Dict, Any
 from functools import lru_cache
 
 from google.cloud import translate_v2 as translate
@@ -13,17 +19,66 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Accepted names for the course languages -> Google Translate code
+_LANG_MAP = {
+    "es": "es",
+    "spanish": "es",
+    "español": "es",
+    "pt": "pt",
+    "portuguese": "pt",
+    "português": "pt",
+    "pt-br": "pt",
+    "pt-pt": "pt",
+}
+
+# Detected language codes that count as Portuguese
+_PT_VARIANTS = frozenset({"pt", "pt-br", "pt-pt"})
+
+# Minimum local detector probability to skip the API for "auto" sources
+LOCAL_DETECTION_MIN_CONFIDENCE = 0.99
+
+
+@functools.cache
+def _local_language_identifier():
+    """Full langid classifier, or None if langid isn't installed"""
+    try:
+        from langid.langid import LanguageIdentifier, model
+    except ImportError:
+        logger.warning("langid not installed, auto-detected translations always call the API")
+        return None
+    # Probabilities normalized over every language the model knows, so a
+    # confident es/pt guess also rules out English and other languages
+    return LanguageIdentifier.from_modelstring(model, norm_probs=True)
+
 
 class TranslateService:
     """Service for text translation using Google Cloud Translation API"""
 
+    # Google's recommended per-request limits for the v2 API
+    _batch_max_segments = 128
+    _batch_max_chars = 30000
+
+    # Translations are pure functions of (text, source, target); memoize them
+    _cache_ttl_seconds = 86400
+    _translation_cache_max_entries = 10000
+    _detection_cache_max_entries = 5000
+
     def __init__(self):
         self._client: Optional[translate.Client] = None
+        # The client is first touched from to_thread workers; build it only once
+        self._client_lock = threading.Lock()
+        # LRU-ordered: key -> (expires_at, value)
+        self._translation_cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._detection_cache: "OrderedDict[bytes, Tuple[float, Any]]" = OrderedDict()
 
     @property
     def client(self) -> translate.Client:
         """Lazy initialization of the translation client"""
-        if self._client is None:
+        if self._client is not None:
+            return self._client
+        with self._client_lock:
+            if self._client is not None:
+                return self._client
             try:
                 import os
                 cred_path = settings.firebase_service_account_path
@@ -42,6 +97,89 @@ class TranslateService:
                 raise
         return self._client
 
+    async def warmup(self):
+        """Load the local language model ahead of the first request"""
+        await asyncio.to_thread(_local_language_identifier)
+
+    @staticmethod
+    def _detect_locally(text: str, target_lang: str) -> Optional[float]:
+        """Local model confidence that text is already in target_lang, or None if not confident"""
+        identifier = _local_language_identifier()
+        if identifier is None:
+            return None
+        language, confidence = identifier.classify(text)
+        if language != target_lang or confidence < LOCAL_DETECTION_MIN_CONFIDENCE:
+            return None
+        return float(confidence)
+
+    def _translate_texts_sync(
+        self,
+        texts: List[str],
+        source_lang: Optional[str],
+        target_lang: str,
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Blocking translation of texts with one API call.
+
+        For auto-detected sources, texts the local model confidently places in
+        the target language are returned as they are, without billing.
+        """
+        results: List[Optional[Tuple[str, str, float]]] = [None] * len(texts)
+        to_send: List[int] = []
+        for i, text in enumerate(texts):
+            if source_lang is None:
+                confidence = self._detect_locally(text, target_lang)
+                if confidence is not None:
+                    results[i] = (text, target_lang, confidence)
+                    continue
+            to_send.append(i)
+
+        if to_send:
+            api_results = self.client.translate(
+                [texts[i] for i in to_send],
+                source_language=source_lang,
+                target_language=target_lang,
+            )
+            for i, result in zip(to_send, api_results):
+                detected_language = result.get("detectedSourceLanguage", source_lang or "es")
+                results[i] = (
+                    result["translatedText"],
+                    self._normalize_to_supported(detected_language),
+                    1.0,
+                )
+
+        return results
+
+    @staticmethod
+    def _text_key(text: str) -> bytes:
+        """Fixed-size digest of a text, so cache keys don't hold whole texts"""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def _get_cached(self, cache: OrderedDict, key) -> Optional[Any]:
+        """Return a cached value if present and not expired, marking it recently used"""
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return value
+
+    def _set_cached(self, cache: OrderedDict, key, value: Any, max_entries: int):
+        """Cache a value, evicting the least recently used entries past max_entries"""
+        cache[key] = (time.monotonic() + self._cache_ttl_seconds, value)
+        cache.move_to_end(key)
+        while len(cache) > max_entries:
+            cache.popitem(last=False)
+
+    def clear_cache(self):
+        """Drop all memoized translations and language detections"""
+        self._translation_cache.clear()
+        self._detection_cache.clear()
+        logger.info("Translation cache cleared")
+
     async def translate(
         self,
         text: str,
@@ -69,31 +207,115 @@ class TranslateService:
         if source_lang == target_lang and source_lang is not None:
             return text, source_lang, 1.0
 
+        cache_key = (source_lang, target_lang, self._text_key(text))
+        cached = self._get_cached(self._translation_cache, cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            # Call Google Cloud Translation API
-            result = self.client.translate(
-                text,
-                source_language=source_lang,
-                target_language=target_lang,
+            # Local detection and the blocking API client both run off the event loop
+            (result,) = await asyncio.to_thread(
+                self._translate_texts_sync, [text], source_lang, target_lang
             )
 
-            translated_text = result["translatedText"]
-            detected_language = result.get("detectedSourceLanguage", source_lang or "es")
-
-            # Normalize detected language to our supported codes
-            detected_language = self._normalize_to_supported(detected_language)
-
+            translated_text, detected_language, _ = result
             logger.info(
                 f"Translation successful: {detected_language} -> {target_lang}, "
                 f"text length: {len(text)} -> {len(translated_text)}"
             )
 
-            return translated_text, detected_language, 1.0
+            self._set_cached(
+                self._translation_cache, cache_key, result, self._translation_cache_max_entries
+            )
+            return result
 
         except Exception as e:
             logger.error(f"Translation failed: {e}")
             raise
 
+    async def translate_batch(
+        self,
+        texts: List[str],
+        source_language: str = "auto",
+        target_language: str = "pt",
+    ) -> List[Tuple[str, str, float]]:
+        """
+        Translate many texts with as few API calls as possible.
+
+        Duplicates are translated once, and the remaining texts are sent in
+        chunks that stay within Google's per-request limits.
+
+        Args:
+            texts: Texts to translate
+            source_language: Source language code ('es', 'pt', or 'auto' for detection)
+            target_language: Target language code ('es' or 'pt')
+
+        Returns:
+            List of (translated_text, detected_language, confidence), in input order
+        """
+        if any(not text or not text.strip() for text in texts):
+            raise ValueError("Text cannot be empty")
+
+        source_lang = None if source_language == "auto" else self._normalize_language(source_language)
+        target_lang = self._normalize_language(target_language)
+
+        if source_lang == target_lang and source_lang is not None:
+            return [(text, source_lang, 1.0) for text in texts]
+
+        results: Dict[str, Tuple[str, str, float]] = {}
+        missing: List[str] = []
+        for text in dict.fromkeys(texts):
+            cached = self._get_cached(
+                self._translation_cache, (source_lang, target_lang, self._text_key(text))
+            )
+            if cached is not None:
+                results[text] = cached
+            else:
+                missing.append(text)
+
+        try:
+            for chunk in self._chunk_for_batch(missing):
+                chunk_results = await asyncio.to_thread(
+                    self._translate_texts_sync, chunk, source_lang, target_lang
+                )
+                for text, result in zip(chunk, chunk_results):
+                    results[text] = result
+                    self._set_cached(
+                        self._translation_cache,
+                        (source_lang, target_lang, self._text_key(text)),
+                        result,
+                        self._translation_cache_max_entries,
+                    )
+        except Exception as e:
+            logger.error(f"Batch translation failed: {e}")
+            raise
+
+        logger.info(
+            f"Batch translation successful: {len(texts)} texts "
+            f"({len(missing)} not cached) -> {target_lang}"
+        )
+
+        return [results[text] for text in texts]
+
+    def _chunk_for_batch(self, texts: List[str]) -> List[List[str]]:
+        """Split texts into chunks within the per-request segment and size limits"""
+        chunks: List[List[str]] = []
+        current: List[str] = []
+        current_chars = 0
+        for text in texts:
+            if current and (
+                len(current) >= self._batch_max_segments
+                or current_chars + len(text) > self._batch_max_chars
+            ):
+                chunks.append(current)
+                current = []
+                current_chars = 0
+            current.append(text)
+            current_chars += len(text)
+        if current:
+            chunks.append(current)
+        return chunks
+
     async def detect_language(self, text: str) -> Tuple[str, float]:
         """
         Detect the language of the given text.
@@ -107,8 +329,13 @@ class TranslateService:
         if not text or not text.strip():
             raise ValueError("Text cannot be empty")
 
+        cache_key = self._text_key(text)
+        cached = self._get_cached(self._detection_cache, cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            result = self.client.detect_language(text)
+            result = await asyncio.to_thread(self.client.detect_language, text)
 
             language = result["language"]
             confidence = result.get("confidence", 1.0)
@@ -118,6 +345,9 @@ class TranslateService:
 
             logger.info(f"Language detected: {language} (confidence: {confidence})")
 
+            self._set_cached(
+                self._detection_cache, cache_key, (language, confidence), self._detection_cache_max_entries
+            )
             return language, confidence
 
         except Exception as e:
@@ -126,41 +356,17 @@ class TranslateService:
 
     def _normalize_language(self, lang_code: str) -> str:
         """Normalize language code to Google Translate format"""
-        lang_map = {
-            "es": "es",
-            "spanish": "es",
-            "español": "es",
-            "pt": "pt",
-            "portuguese": "pt",
-            "português": "pt",
-            "pt-br": "pt",
-            "pt-pt": "pt",
-        }
-        return lang_map.get(lang_code.lower(), lang_code.lower())
+        lang_code = lang_code.lower()
+        return _LANG_MAP.get(lang_code, lang_code)
 
     def _normalize_to_supported(self, lang_code: str) -> str:
         """Normalize detected language to our supported languages (es/pt)"""
-        lang_code = lang_code.lower()
-
-        # Spanish variants
-        if lang_code in ["es", "es-419", "es-es", "es-mx", "es-pe"]:
-            return "es"
-
-        # Portuguese variants
-        if lang_code in ["pt", "pt-br", "pt-pt"]:
-            return "pt"
-
-        # Default to Spanish for unsupported languages in this course context
-        return "es"
-
-
-# Singleton instance
-_translate_service: Optional[TranslateService] = None
+        # Spanish variants and unsupported languages both map to Spanish in
+        # this course context
+        return "pt" if lang_code.lower() in _PT_VARIANTS else "es"
 
 
+@functools.cache
 def get_translate_service() -> TranslateService:
     """Get the singleton translate service instance"""
-    global _translate_service
-    if _translate_service is None:
-        _translate_service = TranslateService()
-    return _translate_service
+    return TranslateService()
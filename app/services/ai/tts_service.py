@@ -2,9 +2,11 @@
 Text-to-Speech Service
 Audio generation using edge-tts (Microsoft Edge voices) with fallbacks
 """
+import functools
 import logging
-from typing import Optional, List
-from io import BytesIO
+import re
+import struct
+from typing import Optional, List, Tuple
 import asyncio
 
 from app.config import settings
@@ -12,33 +14,6 @@ from app.config import settings
 logger = logging.getLogger(__name__)
 
 
-# Available TTS voices using Microsoft Edge TTS (natural sounding)
-# Format: voice_id -> edge-tts voice name
-EDGE_TTS_VOICES = {
-    # Spanish - Spain (Male)
-    "es-ES-Standard-B": "es-ES-AlvaroNeural",
-    "es-ES-Standard-D": "es-ES-AlvaroNeural",
-    # Spanish - Spain (Female)
-    "es-ES-Standard-A": "es-ES-ElviraNeural",
-    "es-ES-Standard-C": "es-ES-ElviraNeural",
-    # Spanish - Mexico (Male)
-    "es-MX-Standard-B": "es-MX-JorgeNeural",
-    # Spanish - Mexico (Female)
-    "es-MX-Standard-A": "es-MX-DaliaNeural",
-    # Portuguese - Brazil (Male)
-    "pt-BR-Standard-B": "pt-BR-AntonioNeural",
-    # Portuguese - Brazil (Female)
-    "pt-BR-Standard-A": "pt-BR-FranciscaNeural",
-    # Portuguese - Portugal (Male)
-    "pt-PT-Standard-B": "pt-PT-DuarteNeural",
-    # Portuguese - Portugal (Female)
-    "pt-PT-Standard-A": "pt-PT-RaquelNeural",
-    # English - US (Male)
-    "en-US-Standard-B": "en-US-GuyNeural",
-    # English - US (Female)
-    "en-US-Standard-A": "en-US-JennyNeural",
-}
-
 # Voice metadata for the API
 AVAILABLE_VOICES = [
     {"id": "es-ES-Standard-A", "name": "Elvira", "language": "es-ES", "gender": "female", "edge_voice": "es-ES-ElviraNeural"},
@@ -55,12 +30,158 @@ AVAILABLE_VOICES = [
     {"id": "en-US-Standard-B", "name": "Guy", "language": "en-US", "gender": "male", "edge_voice": "en-US-GuyNeural"},
 ]
 
+# Lookups derived from AVAILABLE_VOICES so the tables can't drift apart
+VOICE_INFO_BY_ID = {voice["id"]: voice for voice in AVAILABLE_VOICES}
+
+# Format: voice_id -> edge-tts voice name
+EDGE_TTS_VOICES = {voice["id"]: voice["edge_voice"] for voice in AVAILABLE_VOICES}
+
+# Sentence boundaries used to split long texts for parallel synthesis
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+# MPEG Layer III header tables, keyed by the 2-bit version field
+# (3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5; 1 is reserved)
+_MP3_BITRATES_KBPS = {
+    3: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    0: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),
+    2: (22050, 24000, 16000),
+    0: (11025, 12000, 8000),
+}
+
+# Pause inserted between podcast segments
+_SEGMENT_PAUSE_MS = 300
+
+
+def _mp3_frame_format(data: bytes, offset: int = 0) -> Optional[Tuple[int, int, int, int]]:
+    """
+    (version, bitrate_kbps, sample_rate, channel_mode) of the MP3 frame at offset,
+    or None when there is no Layer III frame header there
+    """
+    if len(data) < offset + 4:
+        return None
+
+    (header,) = struct.unpack_from(">I", data, offset)
+    version = (header >> 19) & 0b11
+    layer = (header >> 17) & 0b11
+    bitrate_index = (header >> 12) & 0xF
+    sample_rate_index = (header >> 10) & 0b11
+
+    if (
+        header >> 21 != 0x7FF
+        or version == 1
+        or layer != 0b01
+        or bitrate_index in (0, 15)
+        or sample_rate_index == 3
+    ):
+        return None
+
+    return (
+        version,
+        _MP3_BITRATES_KBPS[version][bitrate_index],
+        _MP3_SAMPLE_RATES[version][sample_rate_index],
+        (header >> 6) & 0b11,
+    )
+
+
+def _mp3_audio_frames(data: bytes) -> Optional[Tuple[Tuple[int, int, int, int], bytes]]:
+    """
+    Format of the audio frames and the frames themselves, with ID3 tags and a
+    leading Xing/Info/VBRI header frame stripped, or None when the data doesn't
+    start with a Layer III frame
+    """
+    offset = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        # ID3v2 size is a 28-bit syncsafe integer, excluding header and footer
+        offset = 10 + ((data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9])
+        if data[5] & 0x10:
+            offset += 10
+
+    mp3_format = _mp3_frame_format(data, offset)
+    if mp3_format is None:
+        return None
+
+    # A Xing/Info (LAME) or VBRI tag sits in the first frame's audio data and
+    # describes that one file's length; it must not end up mid-stream
+    version, bitrate_kbps, sample_rate, channel_mode = mp3_format
+    protected = not data[offset + 1] & 0x01
+    if version == 3:
+        side_info_length = 17 if channel_mode == 3 else 32
+    else:
+        side_info_length = 9 if channel_mode == 3 else 17
+    xing_offset = offset + 4 + (2 if protected else 0) + side_info_length
+    if (
+        data[xing_offset:xing_offset + 4] in (b"Xing", b"Info")
+        or data[offset + 36:offset + 40] == b"VBRI"
+    ):
+        padding = (data[offset + 2] >> 1) & 0x01
+        offset += (144 if version == 3 else 72) * bitrate_kbps * 1000 // sample_rate + padding
+        mp3_format = _mp3_frame_format(data, offset)
+        if mp3_format is None:
+            return None
+
+    end = len(data)
+    if end - offset >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128  # ID3v1 trailer
+
+    return mp3_format, data[offset:end]
+
+
+def _mp3_silent_frames(mp3_format: Tuple[int, int, int, int], duration_ms: int) -> bytes:
+    """
+    Silent Layer III frames in the given format.
+    A frame with zeroed side info carries no main data and decodes to silence.
+    """
+    version, bitrate_kbps, sample_rate, channel_mode = mp3_format
+    header = (
+        (0x7FF << 21)
+        | (version << 19)
+        | (0b01 << 17)  # Layer III
+        | (1 << 16)  # No CRC
+        | (_MP3_BITRATES_KBPS[version].index(bitrate_kbps) << 12)
+        | (_MP3_SAMPLE_RATES[version].index(sample_rate) << 10)
+        | (channel_mode << 6)
+    )
+    samples_per_frame = 1152 if version == 3 else 576
+    frame_length = (144 if version == 3 else 72) * bitrate_kbps * 1000 // sample_rate
+    frame = struct.pack(">I", header) + bytes(frame_length - 4)
+    frame_count = max(1, round(duration_ms * sample_rate / (1000 * samples_per_frame)))
+    return frame * frame_count
+
+
+@functools.cache
+def _shared_connector_class():
+    """aiohttp connector that outlives the ClientSession edge-tts opens per call"""
+    import aiohttp
+
+    class SharedTCPConnector(aiohttp.TCPConnector):
+        async def close(self):
+            # edge-tts owns (and closes) a session per synthesis; keep the
+            # connector, its DNS cache and SSL context, until aclose()
+            return None
+
+        async def close_shared(self):
+            await super().close()
+
+    return SharedTCPConnector
+
 
 class TTSService:
     """Service for text-to-speech generation using edge-tts"""
 
+    _segment_concurrency = 8  # Parallel edge-tts streams across the service
+    _split_threshold_chars = 800  # Shorter texts are synthesized in one stream
+    _mp3_silence_cache: dict = {}  # (version, bitrate, sample rate, channels) -> silent frames
+
     def __init__(self):
         self._initialized = False
+        self._edge_connector = None
+        # Held for each edge-tts stream, so segments and the sentence chunks of
+        # long texts share one limit
+        self._edge_semaphore = asyncio.Semaphore(self._segment_concurrency)
 
     def _ensure_initialized(self):
         """Initialize TTS service"""
@@ -69,12 +190,33 @@ class TTSService:
         self._initialized = True
         logger.info("TTS Service initialized with edge-tts")
 
+    def _get_edge_connector(self):
+        """Shared connector passed to every edge-tts Communicate"""
+        if self._edge_connector is None:
+            self._edge_connector = _shared_connector_class()(
+                limit=self._segment_concurrency * 2,
+                ttl_dns_cache=300,
+            )
+        return self._edge_connector
+
+    async def warmup(self):
+        """Import edge-tts and build the shared connector ahead of the first request"""
+        self._ensure_initialized()
+        try:
+            import edge_tts  # noqa: F401
+            self._get_edge_connector()
+        except ImportError:
+            logger.warning("edge-tts not installed, gtts fallback will be used")
+
+    async def aclose(self):
+        """Close the shared edge-tts connector"""
+        if self._edge_connector is not None:
+            await self._edge_connector.close_shared()
+            self._edge_connector = None
+
     def get_voice_info(self, voice_id: str) -> Optional[dict]:
         """Get voice information by ID"""
-        for voice in AVAILABLE_VOICES:
-            if voice["id"] == voice_id:
-                return voice
-        return None
+        return VOICE_INFO_BY_ID.get(voice_id)
 
     def _get_edge_voice(self, voice_id: str) -> str:
         """Get edge-tts voice name from voice_id"""
@@ -113,19 +255,23 @@ class TTSService:
         pitch_str = f"+{pitch_hz}Hz" if pitch_hz >= 0 else f"{pitch_hz}Hz"
 
         try:
-            import edge_tts
-
-            # Create communicate object
-            communicate = edge_tts.Communicate(text, edge_voice, rate=rate_str, pitch=pitch_str)
-
-            # Generate audio to bytes
-            audio_data = BytesIO()
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    audio_data.write(chunk["data"])
-
-            audio_data.seek(0)
-            return audio_data.read()
+            chunks = self._split_text(text)
+            if len(chunks) == 1:
+                return await self._synthesize_edge(text, edge_voice, rate_str, pitch_str)
+
+            # Long text: synthesize sentence groups concurrently. Every chunk is
+            # the same edge-tts MP3 format, so the streams concatenate directly.
+            # The TaskGroup cancels the remaining chunks on the first failure so
+            # they don't keep streaming while the gtts fallback runs.
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    tasks = [
+                        tg.create_task(self._synthesize_edge(chunk, edge_voice, rate_str, pitch_str))
+                        for chunk in chunks
+                    ]
+            except ExceptionGroup as eg:
+                raise eg.exceptions[0]
+            return b"".join(task.result() for task in tasks)
 
         except ImportError:
             logger.warning("edge-tts not installed, falling back to gtts")
@@ -134,6 +280,47 @@ class TTSService:
             logger.error(f"edge-tts generation error: {e}, falling back to gtts")
             return await self._generate_with_gtts(text, voice_id)
 
+    def _split_text(self, text: str) -> List[str]:
+        """Group sentences into chunks of about _split_threshold_chars; short text stays whole"""
+        if len(text) <= self._split_threshold_chars:
+            return [text]
+
+        chunks: List[str] = []
+        current: List[str] = []
+        current_len = 0
+        for sentence in _SENTENCE_END_RE.split(text):
+            if current and current_len + len(sentence) > self._split_threshold_chars:
+                chunks.append(" ".join(current))
+                current = []
+                current_len = 0
+            current.append(sentence)
+            current_len += len(sentence) + 1
+        if current:
+            chunks.append(" ".join(current))
+        return chunks
+
+    async def _synthesize_edge(self, text: str, edge_voice: str, rate: str, pitch: str) -> bytes:
+        """Stream one edge-tts synthesis into MP3 bytes"""
+        import edge_tts
+
+        # Create communicate object
+        communicate = edge_tts.Communicate(
+            text,
+            edge_voice,
+            rate=rate,
+            pitch=pitch,
+            connector=self._get_edge_connector(),
+        )
+
+        # Accumulate streamed audio directly; no BytesIO write/seek/read copy
+        audio_data = bytearray()
+        async with self._edge_semaphore:
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    audio_data += chunk["data"]
+
+        return bytes(audio_data)
+
     async def _generate_with_gtts(self, text: str, voice_id: str) -> bytes:
         """Fallback to gtts if edge-tts fails"""
         from gtts import gTTS
@@ -150,8 +337,7 @@ class TTSService:
             tts = gTTS(text=text, lang=lang, slow=False)
             audio_buffer = io.BytesIO()
             tts.write_to_fp(audio_buffer)
-            audio_buffer.seek(0)
-            return audio_buffer.read()
+            return audio_buffer.getvalue()
         except Exception as e:
             logger.error(f"gtts generation error: {e}")
             raise
@@ -169,55 +355,140 @@ class TTSService:
         Returns:
             Combined audio content as bytes (MP3 format)
         """
-        from pydub import AudioSegment
-        import io
-
         self._ensure_initialized()
 
-        combined = AudioSegment.empty()
         total_segments = len(segments)
 
         logger.info(f"Generating audio for {total_segments} segments with distinct voices")
 
-        for i, segment in enumerate(segments):
-            text = segment.get("text", "")
-            voice_id = segment.get("voice_id", "es-ES-Standard-A")
-            speed = segment.get("speed", 1.0)
-            pitch = segment.get("pitch", 0.0)
-
-            if not text.strip():
+        # Synthesize all segments concurrently (streams are bounded by
+        # _edge_semaphore); results keep segment order
+        results = await asyncio.gather(
+            *(
+                self._generate_segment(i, total_segments, segment)
+                for i, segment in enumerate(segments)
+            ),
+            return_exceptions=True,
+        )
+
+        audio_parts: List[bytes] = []
+        for i, audio_bytes in enumerate(results):
+            if isinstance(audio_bytes, Exception):
+                logger.error(f"Error generating segment {i+1}: {audio_bytes}")
                 continue
+            if audio_bytes:
+                audio_parts.append(audio_bytes)
 
-            voice_info = self.get_voice_info(voice_id)
-            voice_name = voice_info.get("name", "Unknown") if voice_info else "Unknown"
-            logger.info(f"Segment {i+1}/{total_segments}: {voice_name} ({voice_id}) - {len(text)} chars")
+        if not audio_parts:
+            raise ValueError("No audio segments were generated successfully")
 
-            try:
-                # Generate audio for this segment
-                audio_bytes = await self.generate_audio(text, voice_id, speed, pitch)
+        # edge-tts streams share one output format, so the common case needs no
+        # decode/encode round trip: MP3 frames are self-contained and can be
+        # concatenated as they are
+        combined = self._concat_mp3_frames(audio_parts)
+        if combined is not None:
+            return combined
+
+        return await self._concat_with_pydub(audio_parts)
+
+    def _concat_mp3_frames(self, audio_parts: List[bytes]) -> Optional[bytes]:
+        """Join MP3 streams frame-wise, or None when a part isn't Layer III or the formats differ"""
+        stripped = [_mp3_audio_frames(part) for part in audio_parts]
+        if any(item is None for item in stripped):
+            return None
+        mp3_format = stripped[0][0]
+        if any(item[0] != mp3_format for item in stripped[1:]):
+            return None
+
+        silence = self._mp3_silence_cache.get(mp3_format)
+        if silence is None:
+            silence = _mp3_silent_frames(mp3_format, _SEGMENT_PAUSE_MS)
+            self._mp3_silence_cache[mp3_format] = silence
 
-                # Convert to AudioSegment
-                audio_segment = AudioSegment.from_mp3(io.BytesIO(audio_bytes))
+        combined = silence.join(frames for _, frames in stripped) + silence
 
-                # Add a natural pause between segments (300ms)
-                combined += audio_segment + AudioSegment.silent(duration=300)
+        # Constant bitrate: duration follows from the byte count
+        duration_seconds = len(combined) * 8 / (mp3_format[1] * 1000)
+        logger.info(f"Audio generation complete: ~{duration_seconds:.1f}s total duration (frame concat)")
+
+        return combined
+
+    async def _concat_with_pydub(self, audio_parts: List[bytes]) -> bytes:
+        """Decode segments with mismatched formats to PCM and re-encode once"""
+        from pydub import AudioSegment
+        import io
+
+        # Collect raw PCM and build a single AudioSegment at the end, instead of
+        # re-allocating the combined buffer with every +=
+        pcm_chunks: List[bytes] = []
+        reference = None
+        silence = b""
+
+        for i, audio_bytes in enumerate(audio_parts):
+            try:
+                # Convert to AudioSegment (MP3 decode is CPU-bound, keep it off the event loop)
+                audio_segment = await asyncio.to_thread(AudioSegment.from_mp3, io.BytesIO(audio_bytes))
+
+                if reference is None:
+                    reference = audio_segment
+                    # A natural pause between segments
+                    silence = AudioSegment.silent(
+                        duration=_SEGMENT_PAUSE_MS, frame_rate=reference.frame_rate
+                    ).set_channels(reference.channels).set_sample_width(reference.sample_width).raw_data
+                else:
+                    # Raw PCM can only be joined when the formats match
+                    audio_segment = (
+                        audio_segment.set_frame_rate(reference.frame_rate)
+                        .set_channels(reference.channels)
+                        .set_sample_width(reference.sample_width)
+                    )
+
+                pcm_chunks.append(audio_segment.raw_data)
+                pcm_chunks.append(silence)
 
             except Exception as e:
-                logger.error(f"Error generating segment {i+1}: {e}")
+                logger.error(f"Error decoding segment {i+1}: {e}")
                 continue
 
-        if len(combined) == 0:
+        if reference is None:
             raise ValueError("No audio segments were generated successfully")
 
-        # Export combined audio
+        combined = AudioSegment(
+            data=b"".join(pcm_chunks),
+            sample_width=reference.sample_width,
+            frame_rate=reference.frame_rate,
+            channels=reference.channels,
+        )
+
+        # Export combined audio (single MP3 encode)
         output = io.BytesIO()
-        combined.export(output, format="mp3")
-        output.seek(0)
+        await asyncio.to_thread(combined.export, output, format="mp3")
 
         duration_seconds = len(combined) / 1000
         logger.info(f"Audio generation complete: {duration_seconds:.1f}s total duration")
 
-        return output.read()
+        return output.getvalue()
+
+    async def _generate_segment(
+        self,
+        i: int,
+        total_segments: int,
+        segment: dict,
+    ) -> Optional[bytes]:
+        """Generate audio for one segment, or None if it has no text"""
+        text = segment.get("text", "")
+        voice_id = segment.get("voice_id", "es-ES-Standard-A")
+        speed = segment.get("speed", 1.0)
+        pitch = segment.get("pitch", 0.0)
+
+        if not text.strip():
+            return None
+
+        voice_info = self.get_voice_info(voice_id)
+        voice_name = voice_info.get("name", "Unknown") if voice_info else "Unknown"
+        logger.info(f"Segment {i+1}/{total_segments}: {voice_name} ({voice_id}) - {len(text)} chars")
+
+        return await self.generate_audio(text, voice_id, speed, pitch)
 
     def estimate_duration(self, text: str, speed: float = 1.0) -> float:
         """
@@ -230,13 +501,7 @@ class TTSService:
         return words / words_per_second
 
 
-# Singleton instance
-_tts_service: Optional[TTSService] = None
-
-
+@functools.cache
 def get_tts_service() -> TTSService:
     """Get the TTS service singleton"""
-    global _tts_service
-    if _tts_service is None:
-        _tts_service = TTSService()
-    return _tts_service
+    return TTSService()
@@ -5,8 +5,12 @@ Provides assembled prompts for all AI modules using the 3-layer architecture:
 2. Structure Template (Content Organization)
 3. Module Extension (Module-specific instructions)
 """
+import asyncio
+import functools
 import logging
-from typing import Optional, Dict, Any
+import re
+import time
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime
 
 from app.core.firebase_admin import get_document, set_document
@@ -22,13 +26,60 @@ logger = logging.getLogger(__name__)
 
 COLLECTION = "ai_studio_config"
 
+# Generation data appended after the prompt layers
+_DATA_SECTION_TEMPLATE = """
+---
+
+## DATOS DE GENERACIÓN
+- Tema: {tema}
+- Nivel: {nivel}
+- Unidad: {unidad}
+- Duración: {duracion}
+- Objetivo: {objetivo}
+{contexto_adicional}
+Genera el contenido completo siguiendo todas las instrucciones anteriores."""
+
+# {{variable}} placeholders in prompt layers
+_VARIABLE_RE = re.compile(r"\{\{(\w+)\}\}")
+
+# Documents created in Firestore when a layer is missing; created_at is
+# added when the document is actually written
+_DEFAULT_MASTER_DOC = {
+    "id": "master_prompt",
+    "content": DEFAULT_MASTER_PROMPT,
+    "current_version": 1,
+    "is_active": True,
+}
+
+_DEFAULT_STRUCTURE_DOC = {
+    "id": "structure_template",
+    "content": DEFAULT_STRUCTURE_TEMPLATE,
+    "is_active": True,
+}
+
+_DEFAULT_EXTENSION_DOCS = {
+    module: {
+        "id": f"extension_{module}",
+        "module": module,
+        "name": default_ext["name"],
+        "description": default_ext["description"],
+        "content": default_ext["content"],
+        "parameters": default_ext["parameters"],
+        "is_active": True,
+    }
+    for module, default_ext in DEFAULT_MODULE_EXTENSIONS.items()
+}
+
+
+async def _empty_layer() -> dict:
+    """Stand-in for a layer that is left out of the prompt"""
+    return {"content": ""}
+
 
 class UnifiedPromptService:
     """Service for assembling prompts from the 3-layer architecture"""
 
     _instance = None
-    _cache: Dict[str, Any] = {}
-    _cache_timestamp: Optional[datetime] = None
     _cache_ttl_seconds = 300  # 5 minutes cache
 
     def __new__(cls):
@@ -36,82 +87,79 @@ class UnifiedPromptService:
             cls._instance = super().__new__(cls)
         return cls._instance
 
+    def __init__(self):
+        # __new__ returns the shared instance, so only set state up once
+        if getattr(self, "_initialized", False):
+            return
+        # doc_id -> (expires_at, doc); each document expires on its own clock
+        self._cache: Dict[str, Tuple[float, dict]] = {}
+        # One lock per document so concurrent misses share a single Firestore read
+        self._fetch_locks: Dict[str, asyncio.Lock] = {}
+        self._initialized = True
+
+    def _get_fresh(self, doc_id: str) -> Optional[dict]:
+        """Return the cached document if it hasn't expired"""
+        entry = self._cache.get(doc_id)
+        if entry is not None and time.monotonic() < entry[0]:
+            return entry[1]
+        return None
+
     async def _get_cached_or_fetch(self, doc_id: str, default_data: dict) -> dict:
         """Get from cache or fetch from Firestore"""
-        now = datetime.utcnow()
-
-        # Check cache validity
-        if self._cache_timestamp and (now - self._cache_timestamp).total_seconds() < self._cache_ttl_seconds:
-            if doc_id in self._cache:
-                return self._cache[doc_id]
-
-        # Fetch from Firestore
-        doc = await get_document(COLLECTION, doc_id)
-        if not doc:
-            # Create default
-            await set_document(COLLECTION, doc_id, default_data)
-            doc = default_data
-
-        # Update cache
-        self._cache[doc_id] = doc
-        self._cache_timestamp = now
+        doc = self._get_fresh(doc_id)
+        if doc is not None:
+            return doc
+
+        lock = self._fetch_locks.setdefault(doc_id, asyncio.Lock())
+        async with lock:
+            # Another request may have fetched it while we waited
+            doc = self._get_fresh(doc_id)
+            if doc is not None:
+                return doc
+
+            # Fetch from Firestore
+            doc = await get_document(COLLECTION, doc_id)
+            if not doc:
+                # Create default, stamped with the actual creation time
+                doc = {**default_data, "created_at": datetime.utcnow().isoformat()}
+                await set_document(COLLECTION, doc_id, doc)
+
+            # Update cache
+            self._cache[doc_id] = (time.monotonic() + self._cache_ttl_seconds, doc)
 
         return doc
 
     def clear_cache(self):
         """Clear the prompt cache"""
         self._cache = {}
-        self._cache_timestamp = None
         logger.info("Prompt cache cleared")
 
     async def get_master_prompt(self) -> dict:
         """Get the master prompt"""
-        default = {
-            "id": "master_prompt",
-            "content": DEFAULT_MASTER_PROMPT,
-            "current_version": 1,
-            "is_active": True,
-            "created_at": datetime.utcnow().isoformat(),
-        }
-        return await self._get_cached_or_fetch("master_prompt", default)
+        return await self._get_cached_or_fetch("master_prompt", _DEFAULT_MASTER_DOC)
 
     async def get_structure_template(self) -> dict:
         """Get the structure template"""
-        default = {
-            "id": "structure_template",
-            "content": DEFAULT_STRUCTURE_TEMPLATE,
-            "is_active": True,
-            "created_at": datetime.utcnow().isoformat(),
-        }
-        return await self._get_cached_or_fetch("structure_template", default)
+        return await self._get_cached_or_fetch("structure_template", _DEFAULT_STRUCTURE_DOC)
 
     async def get_module_extension(self, module: str) -> dict:
         """Get the extension for a specific module"""
-        doc_id = f"extension_{module}"
-
-        if module not in DEFAULT_MODULE_EXTENSIONS:
+        default = _DEFAULT_EXTENSION_DOCS.get(module)
+        if default is None:
             raise ValueError(f"Unknown module: {module}")
 
-        default_ext = DEFAULT_MODULE_EXTENSIONS[module]
-        default = {
-            "id": doc_id,
-            "module": module,
-            "name": default_ext["name"],
-            "description": default_ext["description"],
-            "content": default_ext["content"],
-            "parameters": default_ext["parameters"],
-            "is_active": True,
-            "created_at": datetime.utcnow().isoformat(),
-        }
-        return await self._get_cached_or_fetch(doc_id, default)
+        return await self._get_cached_or_fetch(default["id"], default)
 
     def _replace_variables(self, template: str, variables: Dict[str, Any]) -> str:
-        """Replace {{variable}} placeholders in template"""
-        result = template
-        for key, value in variables.items():
-            placeholder = "{{" + key + "}}"
-            result = result.replace(placeholder, str(value) if value else "")
-        return result
+        """Replace {{variable}} placeholders in template (unknown placeholders are kept)"""
+        def substitute(match: re.Match) -> str:
+            key = match.group(1)
+            if key not in variables:
+                return match.group(0)
+            value = variables[key]
+            return "" if value is None else str(value)
+
+        return _VARIABLE_RE.sub(substitute, template)
 
     async def assemble_prompt(
         self,
@@ -130,10 +178,12 @@ class UnifiedPromptService:
         Returns:
             The fully assembled prompt string
         """
-        # Get all layers
-        master = await self.get_master_prompt()
-        structure = await self.get_structure_template() if include_structure else {"content": ""}
-        extension = await self.get_module_extension(module.value)
+        # Get all layers concurrently (up to three Firestore reads on a cold cache)
+        master, structure, extension = await asyncio.gather(
+            self.get_master_prompt(),
+            self.get_structure_template() if include_structure else _empty_layer(),
+            self.get_module_extension(module.value),
+        )
 
         # Prepare variables
         variables = {
@@ -155,34 +205,24 @@ class UnifiedPromptService:
         structure_content = self._replace_variables(structure.get("content", ""), variables)
         extension_content = self._replace_variables(extension["content"], variables)
 
-        # Assemble final prompt
-        parts = [master_content]
-
-        if include_structure and structure_content:
-            parts.append("---\n\n" + structure_content)
-
-        parts.append("---\n\n" + extension_content)
-
-        # Add generation data
-        data_section = f"""
----
-
-## DATOS DE GENERACIÓN
-- Tema: {context.tema}
-- Nivel: {context.nivel}
-- Unidad: {context.unidad or 'N/A'}
-- Duración: {context.duracion or 'Variable'}
-- Objetivo: {context.objetivo or 'Dominar el tema presentado'}
-"""
-
-        if context.additional_context:
-            data_section += f"\n## CONTEXTO ADICIONAL\n{context.additional_context}\n"
-
-        data_section += "\nGenera el contenido completo siguiendo todas las instrucciones anteriores."
-
-        parts.append(data_section)
+        # Assemble final prompt in one pass
+        structure_section = (
+            f"---\n\n{structure_content}\n\n" if include_structure and structure_content else ""
+        )
+        additional_section = (
+            f"\n## CONTEXTO ADICIONAL\n{context.additional_context}\n"
+            if context.additional_context else ""
+        )
+        data_section = _DATA_SECTION_TEMPLATE.format(
+            tema=context.tema,
+            nivel=context.nivel,
+            unidad=context.unidad or "N/A",
+            duracion=context.duracion or "Variable",
+            objetivo=context.objetivo or "Dominar el tema presentado",
+            contexto_adicional=additional_section,
+        )
 
-        return "\n\n".join(parts)
+        return f"{master_content}\n\n{structure_section}---\n\n{extension_content}\n\n{data_section}"
 
     async def get_quick_prompt(
         self,
@@ -221,13 +261,7 @@ class UnifiedPromptService:
         return extension.get("parameters", {})
 
 
-# Singleton instance
-_prompt_service: Optional[UnifiedPromptService] = None
-
-
+@functools.cache
 def get_unified_prompt_service() -> UnifiedPromptService:
     """Get the unified prompt service singleton"""
-    global _prompt_service
-    if _prompt_service is None:
-        _prompt_service = UnifiedPromptService()
-    return _prompt_service
+    return UnifiedPromptService()
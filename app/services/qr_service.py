@@ -2,33 +2,142 @@
 QR Code Service
 Generate and validate QR codes for student authentication
 """
+import asyncio
+import functools
 import hashlib
 import logging
-from typing import Optional, Tuple
-from datetime import datetime
+import time
+from typing import BinaryIO, Dict, List, Optional, Tuple
 from io import BytesIO
 
-import qrcode
-from qrcode.constants import ERROR_CORRECT_L, ERROR_CORRECT_M, ERROR_CORRECT_Q, ERROR_CORRECT_H
+from firebase_admin import firestore
 
-from app.core.firebase_admin import get_document, update_document
+from app.core.firebase_admin import get_document, get_firestore, update_document
 
 logger = logging.getLogger(__name__)
 
+# hashlib.sha256 is OpenSSL's implementation (SHA-NI accelerated on CPUs that
+# have it) unless the interpreter was built without OpenSSL and fell back to
+# the builtin _sha256 module
+if hashlib.sha256.__name__ != "openssl_sha256":
+    logger.warning("hashlib.sha256 is not backed by OpenSSL; QR hashing falls back to the builtin implementation")
+
+# Error correction levels, by lowercase letter (segno's level names)
+_ERROR_LEVELS = {
+    "l": "l",  # ~7% error correction
+    "m": "m",  # ~15% error correction
+    "q": "q",  # ~25% error correction
+    "h": "h",  # ~30% error correction
+}
+_DEFAULT_ERROR_LEVEL = "m"
+
+# Characters of the QR alphanumeric encoding mode
+_QR_ALPHANUMERIC = frozenset("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:")
+
+# (payload byte length, encoding mode, error level) -> (version, mask) chosen by
+# the last full encode. Student payloads have a fixed shape, so later encodes
+# skip segno's version probing and mask scoring; any mask is valid per the QR spec.
+_QR_LAYOUTS: Dict[Tuple[int, str, str], Tuple[int, int]] = {}
+
+
+def _error_level(error_correction: Optional[str]) -> str:
+    """Map an L/M/Q/H letter (any case) to segno's level, defaulting to M"""
+    if not error_correction:
+        return _DEFAULT_ERROR_LEVEL
+    return _ERROR_LEVELS.get(error_correction.lower(), _DEFAULT_ERROR_LEVEL)
+
+
+def _qr_mode(data: str) -> str:
+    """The single-segment encoding mode for data: numeric, alphanumeric or byte"""
+    if data.isascii() and data.isdigit():
+        return "numeric"
+    if _QR_ALPHANUMERIC.issuperset(data):
+        return "alphanumeric"
+    return "byte"
+
+
+def _write_png(
+    out: BinaryIO,
+    data: str,
+    size: int,
+    border: int,
+    error_level: str,
+    fill_color: str,
+    back_color: str,
+) -> None:
+    """Encode a QR code and write it to out as PNG"""
+    # Imported on first render: parsing and verification never need the encoder
+    import segno
+
+    # make_qr never picks a Micro QR; boost_error=False keeps the requested level.
+    # The mode is part of the key and fixed on both paths, so a cached layout
+    # always has room for the same-length payload.
+    mode = _qr_mode(data)
+    layout_key = (len(data.encode()), mode, error_level)
+    layout = _QR_LAYOUTS.get(layout_key)
+    qr = None
+    if layout is not None:
+        try:
+            qr = segno.make_qr(
+                data, error=error_level, mode=mode, boost_error=False,
+                version=layout[0], mask=layout[1],
+            )
+        except segno.DataOverflowError:
+            # Byte length differs from the encoded length (e.g. Latin-1 text);
+            # pick the layout again
+            pass
+    if qr is None:
+        qr = segno.make_qr(data, error=error_level, mode=mode, boost_error=False)
+        _QR_LAYOUTS[layout_key] = (qr.version, qr.mask)
+
+    # segno writes the PNG scanlines straight from the bit matrix, no PIL image.
+    # Output is 1 bit per pixel: greyscale for black/white, otherwise a
+    # two-entry palette
+    qr.save(
+        out,
+        kind="png",
+        scale=size,
+        border=border,
+        dark=fill_color,
+        light=back_color,
+    )
+
+
+def _render_png(
+    data: str,
+    size: int,
+    border: int,
+    error_level: str,
+    fill_color: str,
+    back_color: str,
+) -> bytes:
+    """Render a QR code to PNG bytes"""
+    buffer = BytesIO()
+    _write_png(buffer, data, size, border, error_level, fill_color, back_color)
+    return buffer.getvalue()
+
+
+# Only pays off for payloads that repeat, i.e. re-downloading a student's
+# stored QR (students GET /{id}/qr). Freshly generated QRs carry a new salted
+# hash every time and bypass it.
+_render_png_cached = functools.lru_cache(maxsize=256)(_render_png)
+
 
 class QRService:
     """Service for QR code operations"""
 
     # QR code prefix for identification
     QR_PREFIX = "APOLO"
+    _QR_PREFIX_COLON = QR_PREFIX + ":"
+
+    # Disabled flag spellings found on user documents
+    _DISABLED_KEYS = ("isDisabled", "is_disabled", "isDisbaled")  # last one: typo in original Flutter code
+
+    # Student fields verify_qr_code needs to decide validity
+    _VERIFY_FIELDS = ("qrCodeHash", "qr_code_hash", *_DISABLED_KEYS, "role")
 
-    # Error correction levels
-    ERROR_CORRECTION_LEVELS = {
-        "L": ERROR_CORRECT_L,  # ~7% error correction
-        "M": ERROR_CORRECT_M,  # ~15% error correction
-        "Q": ERROR_CORRECT_Q,  # ~25% error correction
-        "H": ERROR_CORRECT_H,  # ~30% error correction
-    }
+    # Firestore caps a WriteBatch at 500 writes
+    _WRITE_BATCH_SIZE = 500
 
     def generate_hash(self, student_id: str, email: str, salt: Optional[str] = None) -> str:
         """
@@ -43,18 +152,39 @@ class QRService:
             32-character hash string
         """
         if salt is None:
-            salt = datetime.utcnow().isoformat()
+            salt = str(time.time_ns())
 
         data = f"{student_id}:{email}:{salt}"
         return hashlib.sha256(data.encode()).hexdigest()[:32]
 
+    def generate_hash_batch(
+        self,
+        students: List[Tuple[str, str]],
+        salt: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Generate QR hashes for many (student_id, email) pairs
+
+        Same digests as generate_hash with one shared salt; the student ID
+        already makes every input unique.
+        """
+        if salt is None:
+            salt = str(time.time_ns())
+
+        sha256 = hashlib.sha256
+        suffix = f":{salt}"
+        return [
+            sha256(f"{student_id}:{email}{suffix}".encode()).hexdigest()[:32]
+            for student_id, email in students
+        ]
+
     def generate_qr_data(self, student_id: str, qr_hash: str) -> str:
         """
         Generate the data string to encode in QR code
 
         Format: APOLO:{student_id}:{qr_hash}
         """
-        return f"{self.QR_PREFIX}:{student_id}:{qr_hash}"
+        return f"{self._QR_PREFIX_COLON}{student_id}:{qr_hash}"
 
     def parse_qr_data(self, qr_data: str) -> Optional[Tuple[str, str]]:
         """
@@ -66,25 +196,19 @@ class QRService:
         Returns:
             Tuple of (student_id, qr_hash) or None if invalid
         """
-        try:
-            if not qr_data.startswith(f"{self.QR_PREFIX}:"):
-                return None
-
-            parts = qr_data.split(":")
-            if len(parts) != 3:
-                return None
-
-            _, student_id, qr_hash = parts
-
-            if not student_id or not qr_hash:
-                return None
+        if not isinstance(qr_data, str):
+            return None
 
-            return (student_id, qr_hash)
+        prefix, sep, rest = qr_data.partition(":")
+        if not sep or prefix != self.QR_PREFIX:
+            return None
 
-        except Exception as e:
-            logger.error(f"Error parsing QR data: {e}")
+        student_id, sep, qr_hash = rest.partition(":")
+        if not sep or not student_id or not qr_hash or ":" in qr_hash:
             return None
 
+        return (student_id, qr_hash)
+
     def generate_qr_image(
         self,
         data: str,
@@ -93,6 +217,7 @@ class QRService:
         error_correction: str = "M",
         fill_color: str = "black",
         back_color: str = "white",
+        cache: bool = False,
     ) -> bytes:
         """
         Generate QR code image
@@ -104,32 +229,35 @@ class QRService:
             error_correction: L, M, Q, or H
             fill_color: QR code color
             back_color: Background color
+            cache: Memoize the PNG; only useful for payloads rendered repeatedly
 
         Returns:
             PNG image as bytes
         """
-        error_level = self.ERROR_CORRECTION_LEVELS.get(
-            error_correction.upper(),
-            ERROR_CORRECT_M
-        )
-
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=error_level,
-            box_size=size,
-            border=border,
+        render = _render_png_cached if cache else _render_png
+        return render(
+            data, size, border, _error_level(error_correction), fill_color, back_color
         )
 
-        qr.add_data(data)
-        qr.make(fit=True)
-
-        img = qr.make_image(fill_color=fill_color, back_color=back_color)
-
-        buffer = BytesIO()
-        img.save(buffer, format="PNG")
-        buffer.seek(0)
+    def write_qr_image(
+        self,
+        data: str,
+        out: BinaryIO,
+        size: int = 10,
+        border: int = 4,
+        error_correction: str = "M",
+        fill_color: str = "black",
+        back_color: str = "white",
+    ) -> None:
+        """
+        Write a QR code PNG straight into a stream
 
-        return buffer.getvalue()
+        Same options as generate_qr_image, without materializing the image as a
+        separate bytes copy (e.g. for StorageService.upload_qr).
+        """
+        _write_png(
+            out, data, size, border, _error_level(error_correction), fill_color, back_color
+        )
 
     async def generate_student_qr(
         self,
@@ -163,17 +291,76 @@ class QRService:
         if update_database:
             await update_document("users", student_id, {
                 "qrCodeHash": qr_hash,
-                "qrGeneratedAt": datetime.utcnow(),
+                "qrGeneratedAt": firestore.SERVER_TIMESTAMP,
             })
 
         return (image, qr_hash)
 
-    async def verify_qr_code(self, qr_data: str) -> dict:
+    async def generate_student_qrs_batch(
+        self,
+        students: List[Tuple[str, str]],
+        size: int = 10,
+        update_database: bool = True,
+    ) -> List[Tuple[bytes, str]]:
+        """
+        Generate QR codes for many students at once
+
+        Rendering is CPU-bound, so the whole batch runs in one worker thread
+        instead of blocking the event loop once per student.
+
+        Args:
+            students: List of (student_id, email) pairs
+            size: Image size
+            update_database: Whether to update each student's qrCodeHash
+
+        Returns:
+            List of (image_bytes, qr_hash), in the order of students
+        """
+        # Hashing is cheap, keep it in-process
+        qr_hashes = self.generate_hash_batch(students)
+
+        qr_payloads = [
+            self.generate_qr_data(student_id, qr_hash)
+            for (student_id, _), qr_hash in zip(students, qr_hashes)
+        ]
+        images = await asyncio.to_thread(
+            lambda: [
+                _render_png(qr_data, size, 4, _DEFAULT_ERROR_LEVEL, "black", "white")
+                for qr_data in qr_payloads
+            ]
+        )
+
+        if update_database:
+            await self._save_qr_hashes(
+                [(student_id, qr_hash) for (student_id, _), qr_hash in zip(students, qr_hashes)]
+            )
+
+        logger.info(f"Generated {len(images)} student QR codes")
+
+        return list(zip(images, qr_hashes))
+
+    async def _save_qr_hashes(self, updates: List[Tuple[str, str]]) -> None:
+        """Write (student_id, qr_hash) pairs with one batched commit per 500 students"""
+        db = get_firestore()
+        users_ref = db.collection("users")
+
+        for start in range(0, len(updates), self._WRITE_BATCH_SIZE):
+            batch = db.batch()
+            for student_id, qr_hash in updates[start:start + self._WRITE_BATCH_SIZE]:
+                batch.update(users_ref.document(student_id), {
+                    "qrCodeHash": qr_hash,
+                    "qrGeneratedAt": firestore.SERVER_TIMESTAMP,
+                })
+            await asyncio.to_thread(batch.commit)
+
+    async def verify_qr_code(self, qr_data: str, fields: Optional[List[str]] = None) -> dict:
         """
         Verify a QR code and return student information
 
         Args:
             qr_data: Raw QR code data
+            fields: Student fields the caller needs; when given, Firestore only
+                returns these plus the ones verification reads
 
         Returns:
             Dict with verification result:
@@ -198,7 +385,8 @@ class QRService:
         student_id, qr_hash = parsed
 
         # Fetch student data
-        student_data = await get_document("users", student_id)
+        field_paths = [*self._VERIFY_FIELDS, *fields] if fields is not None else None
+        student_data = await get_document("users", student_id, field_paths=field_paths)
 
         if not student_data:
             return {
@@ -220,13 +408,7 @@ class QRService:
             }
 
         # Check if student is disabled
-        is_disabled = (
-            student_data.get("isDisabled") or
-            student_data.get("is_disabled") or
-            student_data.get("isDisbaled")  # typo in original Flutter code
-        )
-
-        if is_disabled:
+        if self._is_disabled(student_data):
             return {
                 "valid": False,
                 "student_id": student_id,
@@ -235,11 +417,7 @@ class QRService:
             }
 
         # Verify student role
-        role = student_data.get("role", [])
-        if isinstance(role, str):
-            role = [role]
-
-        if "student" not in role:
+        if "student" not in self._roles(student_data):
             return {
                 "valid": False,
                 "student_id": student_id,
@@ -254,6 +432,19 @@ class QRService:
             "error": None
         }
 
+    @classmethod
+    def _is_disabled(cls, student_data: dict) -> bool:
+        """Whether any of the disabled flag spellings is set"""
+        return any(student_data.get(key) for key in cls._DISABLED_KEYS)
+
+    @staticmethod
+    def _roles(student_data: dict) -> frozenset:
+        """Roles of a user document, whether stored as a string or a list"""
+        role = student_data.get("role")
+        if isinstance(role, str):
+            return frozenset((role,))
+        return frozenset(role or ())
+
     async def regenerate_qr(self, student_id: str) -> Tuple[bytes, str]:
         """
         Regenerate QR code for an existing student
@@ -2,29 +2,57 @@
 Storage Service
 File upload/download with Firebase Storage
 """
+import asyncio
 import logging
-import uuid
-from typing import Optional, BinaryIO
+import secrets
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from io import BytesIO
+from typing import Callable, List, Optional, BinaryIO, Tuple
 from datetime import datetime, timedelta
 
+from google.cloud.storage import Bucket
+
 from app.core.firebase_admin import get_storage
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Optional per-context bucket override (e.g. set by a request for another
+# tenant) that takes precedence over the app-wide Firebase bucket without
+# touching the singleton. Worker threads from asyncio.to_thread inherit it.
+_BUCKET: ContextVar[Optional[Bucket]] = ContextVar("storage_bucket", default=None)
+
 
 class StorageService:
     """Service for file storage operations"""
 
-    def __init__(self):
-        self._bucket = None
+    _max_concurrent_ops = 16  # Blocking GCS calls in flight at once
+    _signed_url_cache_ttl_seconds = 300
+    _signed_url_cache_max_entries = 10000
 
-    def _get_bucket(self):
-        """Get Firebase Storage bucket"""
+    def __init__(self):
+        self._bucket: Optional[Bucket] = None
+        # google-cloud-storage is blocking: every blob operation runs in a
+        # worker thread, bounded so batch uploads don't exhaust the pool
+        self._semaphore = asyncio.Semaphore(self._max_concurrent_ops)
+        self._signed_url_cache: "OrderedDict[Tuple[str, str, int], Tuple[float, str]]" = OrderedDict()
+
+    def _get_bucket(self) -> Bucket:
+        """Get the context's bucket override, or the Firebase Storage bucket"""
+        bucket = _BUCKET.get()
+        if bucket is not None:
+            return bucket
         if self._bucket is None:
             self._bucket = get_storage()
         return self._bucket
 
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking storage call in a worker thread"""
+        async with self._semaphore:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
     async def upload_file(
         self,
         file_data: bytes,
@@ -44,28 +72,55 @@ class StorageService:
         Returns:
             Public URL of the uploaded file
         """
-        bucket = self._get_bucket()
-
         try:
-            blob = bucket.blob(destination_path)
-            blob.upload_from_string(
-                file_data,
-                content_type=content_type,
+            return await self._run(
+                self._upload_file_sync, file_data, destination_path, content_type, metadata
             )
 
-            if metadata:
-                blob.metadata = metadata
-                blob.patch()
-
-            # Make the file publicly accessible
-            blob.make_public()
-
-            return blob.public_url
-
         except Exception as e:
             logger.error(f"Error uploading file to {destination_path}: {e}")
             raise
 
+    def _upload_file_sync(
+        self,
+        file_data: bytes,
+        destination_path: str,
+        content_type: str,
+        metadata: Optional[dict],
+    ) -> str:
+        blob = self._get_bucket().blob(destination_path)
+
+        # Metadata and the public ACL go out with the upload itself, instead of
+        # a patch() and a make_public() round trip afterwards
+        if metadata:
+            blob.metadata = metadata
+
+        blob.upload_from_string(
+            file_data,
+            content_type=content_type,
+            predefined_acl="publicRead",
+        )
+
+        return blob.public_url
+
+    async def upload_many(
+        self,
+        files: List[Tuple[bytes, str, str]],
+    ) -> List[str]:
+        """
+        Upload several files concurrently
+
+        Args:
+            files: List of (file_data, destination_path, content_type)
+
+        Returns:
+            Public URLs, in the order of files
+        """
+        return await asyncio.gather(*(
+            self.upload_file(file_data, destination_path, content_type=content_type)
+            for file_data, destination_path, content_type in files
+        ))
+
     async def upload_stream(
         self,
         file_stream: BinaryIO,
@@ -83,19 +138,65 @@ class StorageService:
         Returns:
             Public URL of the uploaded file
         """
-        bucket = self._get_bucket()
-
         try:
-            blob = bucket.blob(destination_path)
-            blob.upload_from_file(file_stream, content_type=content_type)
-            blob.make_public()
-
-            return blob.public_url
+            return await self._run(
+                self._upload_stream_sync, file_stream, destination_path, content_type
+            )
 
         except Exception as e:
             logger.error(f"Error uploading stream to {destination_path}: {e}")
             raise
 
+    def _upload_stream_sync(
+        self,
+        file_stream: BinaryIO,
+        destination_path: str,
+        content_type: str,
+    ) -> str:
+        blob = self._get_bucket().blob(destination_path)
+        blob.upload_from_file(
+            file_stream,
+            content_type=content_type,
+            predefined_acl="publicRead",
+        )
+
+        return blob.public_url
+
+    async def upload_qr(
+        self,
+        destination_path: str,
+        render: Callable[[BinaryIO], None],
+    ) -> str:
+        """
+        Upload a PNG rendered straight into the upload buffer
+
+        Args:
+            destination_path: Path in storage
+            render: Writes the PNG into the given stream
+                (e.g. partial(qr_service.write_qr_image, qr_data))
+
+        Returns:
+            Public URL of the uploaded file
+        """
+        try:
+            # Rendering is CPU-bound, so it runs in the worker thread with the upload
+            return await self._run(self._upload_qr_sync, destination_path, render)
+
+        except Exception as e:
+            logger.error(f"Error uploading QR to {destination_path}: {e}")
+            raise
+
+    def _upload_qr_sync(
+        self,
+        destination_path: str,
+        render: Callable[[BinaryIO], None],
+    ) -> str:
+        buffer = BytesIO()
+        render(buffer)
+        buffer.seek(0)
+
+        return self._upload_stream_sync(buffer, destination_path, "image/png")
+
     async def delete_file(self, file_path: str) -> bool:
         """
         Delete a file from Firebase Storage
@@ -106,11 +207,8 @@ class StorageService:
         Returns:
             True if deleted successfully
         """
-        bucket = self._get_bucket()
-
         try:
-            blob = bucket.blob(file_path)
-            blob.delete()
+            await self._run(self._get_bucket().blob(file_path).delete)
             return True
 
         except Exception as e:
@@ -132,14 +230,31 @@ class StorageService:
         Returns:
             Signed URL
         """
-        bucket = self._get_bucket()
-
         try:
+            # A URL is reused for at most half its lifetime, so callers always
+            # get one with plenty of validity left
+            bucket = self._get_bucket()
+            cache_key = (bucket.name, file_path, expiration_minutes)
+            entry = self._signed_url_cache.get(cache_key)
+            if entry is not None:
+                expires_at, url = entry
+                if time.monotonic() < expires_at:
+                    self._signed_url_cache.move_to_end(cache_key)
+                    return url
+                del self._signed_url_cache[cache_key]
+
             blob = bucket.blob(file_path)
-            url = blob.generate_signed_url(
+            url = await self._run(
+                blob.generate_signed_url,
                 expiration=datetime.utcnow() + timedelta(minutes=expiration_minutes),
                 method="GET",
             )
+
+            ttl = min(self._signed_url_cache_ttl_seconds, expiration_minutes * 30)
+            self._signed_url_cache[cache_key] = (time.monotonic() + ttl, url)
+            while len(self._signed_url_cache) > self._signed_url_cache_max_entries:
+                self._signed_url_cache.popitem(last=False)
+
             return url
 
         except Exception as e:
@@ -148,11 +263,8 @@ class StorageService:
 
     async def file_exists(self, file_path: str) -> bool:
         """Check if a file exists in storage"""
-        bucket = self._get_bucket()
-
         try:
-            blob = bucket.blob(file_path)
-            return blob.exists()
+            return await self._run(self._get_bucket().blob(file_path).exists)
 
         except Exception as e:
             logger.error(f"Error checking file existence {file_path}: {e}")
@@ -164,7 +276,7 @@ class StorageService:
         prefix: str = "",
     ) -> str:
         """
-        Generate a unique filename with timestamp and UUID
+        Generate a unique filename with a nanosecond timestamp and random suffix
 
         Args:
             original_filename: Original file name
@@ -174,14 +286,11 @@ class StorageService:
             Unique filename with path
         """
         # Extract extension
-        parts = original_filename.rsplit(".", 1)
-        extension = parts[1] if len(parts) > 1 else ""
-
-        # Generate unique name
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        unique_id = str(uuid.uuid4())[:8]
+        dot = original_filename.rfind(".")
+        extension = original_filename[dot + 1:] if dot != -1 else ""
 
-        filename = f"{timestamp}_{unique_id}"
+        # Generate unique name; the random suffix covers same-nanosecond uploads
+        filename = f"{time.time_ns()}_{secrets.token_hex(4)}"
         if extension:
             filename += f".{extension}"
 